@@ -4,10 +4,13 @@
 from __future__ import annotations
 
 import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 
 
@@ -18,7 +21,10 @@ from typing import Dict, Iterable, List, Set, Tuple
 # Variables globals
 # ---------------------------------
 HORA_REFERENCIA: int = 8       # Hora global per els madrugadors
+HORAS_JORNADA: int = 6         # Hores minimes de cada jornada per al filtre de jornades
 INPUT_PATH: Path = Path('horarios.csv') # Fitxer d'entrada
+PROCESOS: int = os.cpu_count() or 1  # Processos per llegir el csv per trossos (1 = en serie)
+TAM_MIN_PARALELO: int = 8 * 1024 * 1024  # Per sota d'aquesta mida (bytes) el csv es llegeix en serie (com a Practica_final)
 OUTPUT_DIR: Path = Path('.')
 
 
@@ -42,19 +48,53 @@ class RegistroHorario:
         return self.salida - self.entrada
 
 #classe per emmagatzemar els empleats
+# (a mes dels registres porta els acumulats, aixi no cal tornar a recorre'ls)
 @dataclass
 class Empleado:
     nombre: str
     registros: List[RegistroHorario] = field(default_factory=list)
+    horas: int = field(default=0, init=False)
+    num_registros: int = field(default=0, init=False)
+    duracion_min: Optional[int] = field(default=None, init=False)
+    duracion_max: Optional[int] = field(default=None, init=False)
+#funcio per calcular els acumulats dels registres que es passen al constructor
+    def __post_init__(self) -> None:
+        for r in self.registros:
+            self.acumular(r)
 #funcio per agregar un registre
     def agregar_registro(self, r: RegistroHorario) -> None:
         if r.empleado != self.nombre:
             raise ValueError("El registro no corresponde a este empleado")
         self.registros.append(r)
+        self.acumular(r)
+#funcio per actualitzar els acumulats amb un registre sense guardar-lo
+    def acumular(self, r: RegistroHorario) -> None:
+        d = r.duracion()
+        self.horas += d
+        self.num_registros += 1
+        if self.duracion_min is None or d < self.duracion_min:
+            self.duracion_min = d
+        if self.duracion_max is None or d > self.duracion_max:
+            self.duracion_max = d
+#funcio per sumar els acumulats d'un altre empleat amb el mateix nom (per juntar trossos)
+    def combinar(self, otro: Empleado) -> None:
+        self.registros.extend(otro.registros)
+        self.horas += otro.horas
+        self.num_registros += otro.num_registros
+        if otro.duracion_min is not None and (self.duracion_min is None or otro.duracion_min < self.duracion_min):
+            self.duracion_min = otro.duracion_min
+        if otro.duracion_max is not None and (self.duracion_max is None or otro.duracion_max > self.duracion_max):
+            self.duracion_max = otro.duracion_max
+#funcio per saber si totes les jornades duren com a minim horas
+    def todas_las_jornadas_de(self, horas: int) -> bool:
+        return self.num_registros > 0 and self.duracion_min >= horas
+#funcio per saber si alguna jornada dura com a minim horas
+    def alguna_jornada_de(self, horas: int) -> bool:
+        return self.num_registros > 0 and self.duracion_max >= horas
 #funcio per calcular les hores totals
     def horas_totales(self) -> int:
-        return sum(r.duracion() for r in self.registros)
-#funcio per calcular els dies treballats
+        return self.horas
+#funcio per calcular els dies treballats (el gestor els treu de la mascara de dies)
     def dias_trabajados(self) -> int:
         return len({r.dia for r in self.registros})
 #funcio per obtenir la fila csv
@@ -65,19 +105,160 @@ class Empleado:
 
 #classe per gestionar els horaris
 class GestorHorarios:
+    """Agrega los registros en una sola pasada: por empleado (horas, número
+    de registros y turnos mínimo y máximo), los días trabajados como
+    máscara de bits y la primera entrada antes de hora_ref de cada empleado.
+    Todos los CSV de salida y las consultas por umbral de jornada y por
+    combinación de días salen de este estado.
+    Con guardar_registros=False no se guarda la lista de registros (los
+    registros pueden venir de un generador y no quedan en memoria).
+    """
     #constructor
-    def __init__(self, registros: Iterable[RegistroHorario]):
-        self.registros: List[RegistroHorario] = list(registros)
+    def __init__(self, registros: Iterable[RegistroHorario] = (), hora_ref: int = HORA_REFERENCIA,
+                 guardar_registros: bool = True):
+        self.hora_ref = hora_ref
+        self.guardar_registros = guardar_registros
+        self.registros: List[RegistroHorario] = []
         self.empleados: Dict[str, Empleado] = {}
-        for r in self.registros:
-            self.empleados.setdefault(r.empleado, Empleado(r.empleado)).agregar_registro(r)
+        # cada empleat te un id enter (nombres[id]) i una mascara de dies (bit i = DIAS_ES[i];
+        # els dies que no son de la setmana reben bits a partir del 7)
+        self.ids: Dict[str, int] = {}
+        self.nombres: List[str] = []
+        self.mascaras: List[int] = []
+        self.bits_dia: Dict[str, int] = {d: 1 << i for i, d in enumerate(DIAS_ES)}
+        self.madrugadores: Dict[str, int] = {}  # empleat -> hora de la primera entrada abans de hora_ref
+        self.num_registros = 0
+        for r in registros:
+            self.agregar(r)
+#funcio per agregar un registre a tots els acumulats
+    def agregar(self, r: RegistroHorario) -> None:
+        self.num_registros += 1
+        emp = self.empleados.get(r.empleado)
+        if emp is None:
+            emp = self.empleados[r.empleado] = Empleado(r.empleado)
+        if self.guardar_registros:
+            self.registros.append(r)
+            emp.agregar_registro(r)
+        else:
+            emp.acumular(r)
+        self.mascaras[self._id(r.empleado)] |= self._bit_dia(r.dia)
+        if r.entrada < self.hora_ref:
+            self.madrugadores.setdefault(r.empleado, r.entrada)
+#funcio per juntar un altre gestor que ve de la part seguent del fitxer
+    def combinar(self, otro: GestorHorarios) -> None:
+        """Suma los acumulados de otro gestor como si sus registros vinieran
+        después de los de este (así la primera entrada temprana se conserva).
+        """
+        self.num_registros += otro.num_registros
+        self.registros.extend(otro.registros)
+        for nombre, emp in otro.empleados.items():
+            propio = self.empleados.get(nombre)
+            if propio is None:
+                self.empleados[nombre] = emp
+            else:
+                propio.combinar(emp)
+        # els bits dels dies de fora la setmana poden ser diferents a l'altre gestor
+        traduccion = {bit: self._bit_dia(dia) for dia, bit in otro.bits_dia.items()
+                      if self.bits_dia.get(dia) != bit}
+        for nombre, mascara in zip(otro.nombres, otro.mascaras):
+            if traduccion:
+                mascara = self._traducir(mascara, traduccion)
+            self.mascaras[self._id(nombre)] |= mascara
+        for emp, hr in otro.madrugadores.items():
+            self.madrugadores.setdefault(emp, hr)
+#funcio per obtenir (o donar) l'id enter d'un empleat
+    def _id(self, nombre: str) -> int:
+        i = self.ids.get(nombre)
+        if i is None:
+            i = self.ids[nombre] = len(self.nombres)
+            self.nombres.append(nombre)
+            self.mascaras.append(0)
+        return i
+#funcio per obtenir (o donar) el bit d'un dia
+    def _bit_dia(self, dia: str) -> int:
+        bit = self.bits_dia.get(dia)
+        if bit is None:
+            bit = self.bits_dia[dia] = 1 << len(self.bits_dia)
+        return bit
+#funcio per canviar els bits d'una mascara segons la traduccio {bit: bit nou}
+    @staticmethod
+    def _traducir(mascara: int, traduccion: Dict[int, int]) -> int:
+        resultado = mascara
+        for bit in traduccion:
+            resultado &= ~bit
+        for bit, nuevo in traduccion.items():
+            if mascara & bit:
+                resultado |= nuevo
+        return resultado
+#funcio per obtenir la mascara d'uns dies (els dies que no surten al csv reben un bit que no te ningu)
+    def mascara_dias(self, dias: Iterable[str]) -> int:
+        mascara = 0
+        extra = len(self.bits_dia)
+        for d in dias:
+            bit = self.bits_dia.get(normalizar_dia(d))
+            if bit is None:
+                bit, extra = 1 << extra, extra + 1
+            mascara |= bit
+        return mascara
+#funcio per obtenir els empleats que han treballat tots els dies de todos i cap de ninguno
+    def empleados_con_dias(self, todos: Iterable[str] = (), ninguno: Iterable[str] = ()) -> Set[str]:
+        req = self.mascara_dias(todos)
+        excl = self.mascara_dias(ninguno)
+        return {self.nombres[i] for i, m in enumerate(self.mascaras) if m & req == req and not m & excl}
+#funcio per obtenir els empleats que han treballat tots els dies que surten al csv
+    def empleados_en_todos_los_dias(self) -> Set[str]:
+        req = 0
+        for m in self.mascaras:
+            req |= m
+        return {self.nombres[i] for i, m in enumerate(self.mascaras) if m == req}
+#funcio per obtenir el diccionari dia -> empleats (nomes els dies que surten al csv)
+    @property
+    def empleados_por_dia(self) -> Dict[str, Set[str]]:
+        por_dia: Dict[str, Set[str]] = {}
+        for dia, bit in self.bits_dia.items():
+            empleados = {self.nombres[i] for i, m in enumerate(self.mascaras) if m & bit}
+            if empleados:
+                por_dia[dia] = empleados
+        return por_dia
+#funcio per obtenir els empleats amb totes les jornades de com a minim horas
+    def empleados_todas_las_jornadas(self, horas: int) -> Set[str]:
+        return {e.nombre for e in self.empleados.values() if e.todas_las_jornadas_de(horas)}
+#funcio per obtenir els empleats amb alguna jornada de com a minim horas
+    def empleados_alguna_jornada(self, horas: int) -> Set[str]:
+        return {e.nombre for e in self.empleados.values() if e.alguna_jornada_de(horas)}
+#funcio per obtenir els dies treballats d'un empleat (bits a 1 de la seva mascara)
+    def dias_trabajados(self, nombre: str) -> int:
+        return self.mascaras[self.ids[nombre]].bit_count()
+#funcio per obtenir la fila csv d'un empleat
+    def fila_csv(self, emp: Empleado) -> Tuple[str, int, int]:
+        return (emp.nombre, self.dias_trabajados(emp.nombre), emp.horas_totales())
+#funcio per obtenir els empleats ordenats per nom
+    def _ordenados(self) -> List[Empleado]:
+        return sorted(self.empleados.values(), key=lambda e: e.nombre.lower())
 #funcio per escriure el resum
     def escribir_resumen(self, ruta: Path) -> None:
         with ruta.open('w', newline='', encoding='utf-8') as f:
             w = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
             w.writerow(['empleado', 'dias_trabajados', 'horas_totales'])
-            for emp in sorted(self.empleados.values(), key=lambda e: e.nombre.lower()):
-                w.writerow(list(emp.fila_csv()))
+            for emp in self._ordenados():
+                w.writerow(list(self.fila_csv(emp)))
+#funcio per escriure el resum setmanal (dies treballats + hores totals, igual que el resum)
+    def escribir_resumen_semanal(self, ruta: Path) -> None:
+        self.escribir_resumen(ruta)
+#funcio per escriure el resum d'hores
+    def escribir_resumen_horas(self, ruta: Path) -> None:
+        with ruta.open('w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            w.writerow(['empleado', 'horas_totales'])
+            for emp in self._ordenados():
+                w.writerow([emp.nombre, emp.horas])
+#funcio per escriure els madrugadors
+    def escribir_madrugadores(self, ruta: Path) -> None:
+        with ruta.open('w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            w.writerow(['empleado', 'hora_entrada'])
+            for emp, hr in sorted(self.madrugadores.items(), key=lambda x: x[0].lower()):
+                w.writerow([emp, hr])
 
 
 
@@ -144,30 +325,102 @@ def normalizar_dia(d: str) -> str:
 
 #funcio per llegir els registres del csv
 def leer_registros_csv(ruta: Path) -> List[RegistroHorario]:
-    registros: List[RegistroHorario] = []
-    with ruta.open('r', newline='', encoding='utf-8') as f:
-        lector = csv.reader(f, delimiter=';', quotechar='"')
-        for i, fila in enumerate(lector, start=1):
-            if not fila:
-                continue
-            if len(fila) != 4:
-                raise ValueError(f"Línea {i}: se esperaban 4 columnas, llegaron {len(fila)} -> {fila}")
+    return list(iterar_registros_csv(ruta))
 
-            nombre, dia_raw, h_entrada, h_salida = [c.strip() for c in fila]
+#funcio per convertir una fila del csv en registre (None si es buida o la capcalera)
+def _parsear_fila(i: int, fila: List[str]) -> Optional[RegistroHorario]:
+    if not fila:
+        return None
+    if len(fila) != 4:
+        raise ValueError(f"Línea {i}: se esperaban 4 columnas, llegaron {len(fila)} -> {fila}")
 
-            if i == 1 and [c.lower() for c in fila] == CAMPOS:
-                continue
+    nombre, dia_raw, h_entrada, h_salida = [c.strip() for c in fila]
 
-            try:
-                entrada = parse_hora(h_entrada)
-                salida = parse_hora(h_salida)
-            except ValueError:
-                raise ValueError(f"Línea {i}: 'hora_entrada' y 'hora_salida' deben ser horas válidas -> {fila}")
+    if i == 1 and [c.lower() for c in fila] == CAMPOS:
+        return None
 
-            dia = normalizar_dia(dia_raw)
-            r = RegistroHorario(nombre, dia, entrada, salida)
-            registros.append(r)
-    return registros
+    try:
+        entrada = parse_hora(h_entrada)
+        salida = parse_hora(h_salida)
+    except ValueError:
+        raise ValueError(f"Línea {i}: 'hora_entrada' y 'hora_salida' deben ser horas válidas -> {fila}")
+
+    dia = normalizar_dia(dia_raw)
+    return RegistroHorario(nombre, dia, entrada, salida)
+
+#funcio generadora per llegir els registres del csv d'un en un (sense guardar-los tots)
+def iterar_registros_csv(ruta: Path) -> Iterator[RegistroHorario]:
+    with ruta.open('r', newline='', encoding='utf-8') as f:
+        lector = csv.reader(f, delimiter=';', quotechar='"')
+        for i, fila in enumerate(lector, start=1):
+            r = _parsear_fila(i, fila)
+            if r is not None:
+                yield r
+
+#funcio per partir el csv en trossos de bytes que comencen i acaben en final de linia
+# (copia de rangos_por_lineas de Practica_final/Practica_final.py, que es la documentada:
+#  aqui no es separa la capcalera, que es opcional i la salta _parsear_fila; els canvis s'han de fer als dos)
+def rangos_por_lineas(ruta: Path, partes: int) -> List[Tuple[int, int]]:
+    """Devuelve [(inicio, fin), ...] con los rangos de bytes de todo el fichero."""
+    total = ruta.stat().st_size
+    cortes = [0]
+    with ruta.open('rb') as f:
+        for k in range(1, partes):
+            pos = total * k // partes
+            if pos <= cortes[-1]:
+                continue
+            f.seek(pos - 1)
+            f.readline()
+            if f.tell() >= total:
+                break
+            cortes.append(f.tell())
+    cortes.append(total)
+    return [(ini, fin) for ini, fin in zip(cortes, cortes[1:]) if fin > ini]
+
+#funcio que executa cada proces: agrega un tros del csv
+def _agregar_rango(ruta: Path, inicio: int, fin: int, hora_ref: int
+                   ) -> Tuple[Optional[GestorHorarios], int, Optional[Tuple[int, List[str]]]]:
+    """Devuelve (gestor, num_lineas, error). Las líneas van relativas al trozo
+    (empezando en 0); si una fila es inválida el gestor es None y error lleva
+    (línea relativa, fila) para que quien junta los trozos dé la línea absoluta.
+    """
+    with ruta.open('rb') as f:
+        f.seek(inicio)
+        texto = f.read(fin - inicio).decode('utf-8')
+    gestor = GestorHorarios(hora_ref=hora_ref, guardar_registros=False)
+    lector = csv.reader(io.StringIO(texto, newline=''), delimiter=';', quotechar='"')
+    for i, fila in enumerate(lector):
+        try:
+            # al primer tros la linia 0 es la 1 del fitxer (pot ser la capcalera)
+            r = _parsear_fila(i + 1 if inicio == 0 else 0, fila)
+        except ValueError:
+            return None, 0, (i, fila)
+        if r is not None:
+            gestor.agregar(r)
+    return gestor, texto.count('\n'), None
+
+#funcio per agregar el csv repartint els trossos en un pool de processos
+def agregar_csv(ruta: Path, hora_ref: int = HORA_REFERENCIA, procesos: int = PROCESOS) -> GestorHorarios:
+    """Mismo resultado que GestorHorarios(iterar_registros_csv(ruta), hora_ref, False).
+    Cada proceso agrega un trozo del fichero y los gestores parciales se
+    combinan en el orden del fichero. Si el fichero es pequeño
+    (< TAM_MIN_PARALELO) o procesos es 1 se lee en serie.
+    """
+    if procesos <= 1 or ruta.stat().st_size < TAM_MIN_PARALELO:
+        return GestorHorarios(iterar_registros_csv(ruta), hora_ref, guardar_registros=False)
+    rangos = rangos_por_lineas(ruta, procesos * 4)
+    gestor = GestorHorarios(hora_ref=hora_ref, guardar_registros=False)
+    linea_base = 1
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        parciales = pool.map(_agregar_rango, *zip(*[(ruta, ini, fin, hora_ref) for ini, fin in rangos]))
+        for parcial, num_lineas, error in parciales:
+            if error is not None:
+                # es torna a parsejar la fila amb la linia absoluta per donar el mateix error que en serie
+                i, fila = error
+                _parsear_fila(linea_base + i, fila)
+            gestor.combinar(parcial)
+            linea_base += num_lineas
+    return gestor
 
 
 
@@ -176,10 +429,7 @@ def leer_registros_csv(ruta: Path) -> List[RegistroHorario]:
 # -----------------------------
 #funcio per construir els empleats per dia
 def construir_empleados_por_dia(registros: Iterable[RegistroHorario]) -> Dict[str, Set[str]]:
-    empleados_por_dia: Dict[str, Set[str]] = {}
-    for r in registros:
-        empleados_por_dia.setdefault(r.dia, set()).add(r.empleado)
-    return empleados_por_dia
+    return GestorHorarios(registros, guardar_registros=False).empleados_por_dia
 
 #funcio per obtenir els empleats que treballen tots els dies
 def empleados_que_trabajan_en_todos_los_dias(empleados_por_dia: Dict[str, Set[str]]) -> Set[str]:
@@ -200,34 +450,11 @@ def empleados_que_trabajan_en_todos_los_dias(empleados_por_dia: Dict[str, Set[st
 # -----------------------------
 #funcio per escriure el resum d'hores
 def escribir_resumen_horas(registros: Iterable[RegistroHorario], ruta: Path) -> None:
-    horas_totales: Dict[str, int] = {}
-    for r in registros:
-        horas_totales.setdefault(r.empleado, 0)
-        horas_totales[r.empleado] += r.duracion()
-
-    with ruta.open('w', newline='', encoding='utf-8') as f:
-        w = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        w.writerow(['empleado', 'horas_totales'])
-        for empleado, total in sorted(horas_totales.items(), key=lambda x: x[0].lower()):
-            w.writerow([empleado, total])
+    GestorHorarios(registros, guardar_registros=False).escribir_resumen_horas(ruta)
 
 #funcio per escriure els madrugadors
 def escribir_madrugadores(registros: Iterable[RegistroHorario], hora_ref: int, ruta: Path) -> None:
-    madrugadores: List[Tuple[str, int]] = []
-    for r in registros:
-        if r.entrada < hora_ref:
-            madrugadores.append((r.empleado, r.entrada))
-
-    
-    visto: Dict[str, int] = {}
-    for emp, hr in madrugadores:
-        visto.setdefault(emp, hr)
-
-    with ruta.open('w', newline='', encoding='utf-8') as f:
-        w = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        w.writerow(['empleado', 'hora_entrada'])
-        for emp, hr in sorted(visto.items(), key=lambda x: x[0].lower()):
-            w.writerow([emp, hr])
+    GestorHorarios(registros, hora_ref, guardar_registros=False).escribir_madrugadores(ruta)
 
 #funcio per escriure una llista simple
 def escribir_lista_simple(nombres: Iterable[str], ruta: Path, cabecera: str = 'empleado') -> None:
@@ -239,18 +466,7 @@ def escribir_lista_simple(nombres: Iterable[str], ruta: Path, cabecera: str = 'e
 
 #funcio per escriure el resum setmanal
 def escribir_resumen_semanal(registros: Iterable[RegistroHorario], ruta: Path) -> None:
-    horas_totales: Dict[str, int] = {}
-    dias_por_empleado: Dict[str, Set[str]] = {}
-
-    for r in registros:
-        horas_totales[r.empleado] = horas_totales.get(r.empleado, 0) + r.duracion()
-        dias_por_empleado.setdefault(r.empleado, set()).add(r.dia)
-
-    with ruta.open('w', newline='', encoding='utf-8') as f:
-        w = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        w.writerow(['empleado', 'dias_trabajados', 'horas_totales'])
-        for emp in sorted(set(list(horas_totales.keys()) + list(dias_por_empleado.keys())), key=lambda s: s.lower()):
-            w.writerow([emp, len(dias_por_empleado.get(emp, set())), horas_totales.get(emp, 0)])
+    GestorHorarios(registros, guardar_registros=False).escribir_resumen_semanal(ruta)
 
 
 
@@ -267,59 +483,50 @@ def escribir_resumen_semanal(registros: Iterable[RegistroHorario], ruta: Path) -
 def main() -> None:
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Lectura y normalizacio
-    registros = leer_registros_csv(INPUT_PATH)
-    print(f"Se han leído {len(registros)} registros de '{INPUT_PATH}'.")
+    # Lectura, normalitzacio i agregacio en una sola passada (els registres no es guarden);
+    # si el csv es gran es reparteix per trossos entre PROCESOS processos
+    gestor = agregar_csv(INPUT_PATH, HORA_REFERENCIA, PROCESOS)
+    print(f"Se han leído {gestor.num_registros} registros de '{INPUT_PATH}'.")
 
-    # construccio del diccionari dia -> empleats
-    emp_por_dia = construir_empleados_por_dia(registros)
+    # diccionari dia -> empleats
+    emp_por_dia = gestor.empleados_por_dia
     print("Empleados por día:")
     for dia, empleados in sorted(emp_por_dia.items(), key=lambda x: x[0].lower()):
         print(f"  {dia}: {sorted(empleados, key=str.lower)}")
 
-    # empleats que treballen tots els dies
-    en_todos = empleados_que_trabajan_en_todos_los_dias(emp_por_dia)
+    # empleats que treballen tots els dies (amb les mascares de dies)
+    en_todos = gestor.empleados_en_todos_los_dias()
     print(f"Empleados que trabajaron en TODOS los días del CSV: {sorted(en_todos, key=str.lower)}")
 
     # resum d'hores totals
-    escribir_resumen_horas(registros, OUTPUT_DIR / 'resumen_horarios.csv')
+    gestor.escribir_resumen_horas(OUTPUT_DIR / 'resumen_horarios.csv')
     print(f"Generado: {OUTPUT_DIR / 'resumen_horarios.csv'}")
 
     # madrugadors (entrada < HORA_REFERENCIA)
-    escribir_madrugadores(registros, HORA_REFERENCIA, OUTPUT_DIR / 'madrugadores.csv')
+    gestor.escribir_madrugadores(OUTPUT_DIR / 'madrugadores.csv')
     print(f"Generado: {OUTPUT_DIR / 'madrugadores.csv'} (HORA_REFERENCIA={HORA_REFERENCIA})")
 
     # empleats que treballen Lunes i Viernes
-    lunes = emp_por_dia.get('Lunes', set())
-    viernes = emp_por_dia.get('Viernes', set())
-    inter_lu_vi = lunes & viernes
+    inter_lu_vi = gestor.empleados_con_dias(['Lunes', 'Viernes'])
     print(f"Empleados que trabajaron Lunes y Viernes: {sorted(inter_lu_vi, key=str.lower)}")
     escribir_lista_simple(inter_lu_vi, OUTPUT_DIR / 'en_dos_dias.csv')
     print(f"Generado: {OUTPUT_DIR / 'en_dos_dias.csv'}")
 
     # empleats que treballen dissabte pero NO diumenge
-    sabado = emp_por_dia.get('Sábado', set()) | emp_por_dia.get('Sabado', set())
-    domingo = emp_por_dia.get('Domingo', set())
-    exclusivos_sabado = sabado - domingo  # diferencia
+    exclusivos_sabado = gestor.empleados_con_dias(['Sábado'], ninguno=['Domingo'])
     print(f"Empleados que trabajaron Sábado pero NO Domingo: {sorted(exclusivos_sabado, key=str.lower)}")
     escribir_lista_simple(exclusivos_sabado, OUTPUT_DIR / 'exclusivos_sabado.csv')
     print(f"Generado: {OUTPUT_DIR / 'exclusivos_sabado.csv'}")
 
     # resum setmanal (dies treballats + hores totals)
-    escribir_resumen_semanal(registros, OUTPUT_DIR / 'resumen_semanal.csv')
+    gestor.escribir_resumen_semanal(OUTPUT_DIR / 'resumen_semanal.csv')
     print(f"Generado: {OUTPUT_DIR / 'resumen_semanal.csv'}")
 
-    # filtracio empleats que treballen >= 6h en totes les jornades
-    empleados = {r.empleado for r in registros}
-    cumple_6h: Set[str] = set()
-    for emp in empleados:
-        regs_emp = [r for r in registros if r.empleado == emp]
-        if regs_emp and all(r.duracion() >= 6 for r in regs_emp):
-            cumple_6h.add(emp)
-    print(f"Empleados que trabajan ≥ 6h en TODAS sus jornadas: {sorted(cumple_6h, key=str.lower)}")
+    # filtracio empleats que treballen >= HORAS_JORNADA en totes les jornades (amb el torn minim de cada empleat)
+    cumple_6h = gestor.empleados_todas_las_jornadas(HORAS_JORNADA)
+    print(f"Empleados que trabajan ≥ {HORAS_JORNADA}h en TODAS sus jornadas: {sorted(cumple_6h, key=str.lower)}")
 
     # dissenys de classes
-    gestor = GestorHorarios(registros)
     gestor.escribir_resumen(OUTPUT_DIR / 'resumen_clases.csv')
     print(f"Generado: {OUTPUT_DIR / 'resumen_clases.csv'}")
 
@@ -18,12 +18,33 @@ Estructura q segueixen els csv:
 
 from __future__ import annotations
 import csv
+import functools
+import heapq
+import io
+import json
+import math
+import mmap
 import os
+import pickle
+import sqlite3
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, date
-from typing import List, Dict, Tuple, Optional, Set
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, Set, Iterator, Iterable, Union, Sequence, Callable
 import re
 
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sense ell les agrupacions columnars fan un bucle en Python
+    np = None
+
 
 
 
@@ -33,21 +54,45 @@ import re
 # ---------------------------
 
 FECHA_FMT = "%Y-%m-%d"  # Formato de fecha estándar para CSV
+CACHE_FECHAS = 65_536  # dates diferents que es recorden ja parsejades
+FSYNC_CADA = 16  # altes de client que s'acumulen abans de fer fsync del journal
+CAMPOS_CLIENTES = ['id', 'nombre', 'email', 'fecha_alta']
+CAMPOS_EVENTOS = ['id', 'nombre', 'fecha_evento', 'categoria', 'precio']
+CAMPOS_VENTAS = ['id', 'cliente_id', 'evento_id', 'fecha_venta', 'importe']
+TAM_BLOQUE = 10_000  # files per bloc a la lectura en streaming
+TAM_PAGINA = 50  # files per pagina al llistar des del menu
+TAM_BLOQUE_SALIDA = 1_000  # linies que s'escriuen de cop per pantalla
+CARGA_PARALELA = False  # si es True el main carrega els csv grans amb diversos processos
+TAM_MIN_PARALELO = 8 * 1024 * 1024  # per sota d'aquesta mida (bytes) no val la pena repartir
+USAR_SNAPSHOT = True  # si es True el main carrega data/bd.snapshot quan els csv no han canviat
+USAR_VENTAS_BIN = False  # si es True el main escriu data/ventas.bin i el filtre per dates el llegeix amb mmap
+SNAPSHOT_VERSION = 7  # s'ha de pujar si canvien els atributs que es guarden a l'snapshot
+MOTOR = 'memoria'  # motor d'emmagatzematge del main: 'memoria' (llistes) o 'sqlite'
+INSTRUMENTAR = False  # si es True el main mesura temps i files de cada operacio des de l'inici
+DIAS_PROXIMOS = 30  # finestra de dies dels events propers que surt a les estadistiques
 
 #funcio per parejar la data amb datetime
-
+# les ventes tenen poques dates diferents, aixi que es guarden en una cache limitada
+@lru_cache(maxsize=CACHE_FECHAS)
 def parse_fecha(fecha_str: str) -> date:
     """Parsea una fecha en formato YYYY-MM-DD y devuelve datetime.date.
     Lanza ValueError si no cumple el formato.
     """
+    # cami rapid: YYYY-MM-DD exacte amb date.fromisoformat
+    if (len(fecha_str) == 10 and fecha_str[4] == '-' and fecha_str[7] == '-'
+            and fecha_str.isascii() and fecha_str[:4].isdigit()
+            and fecha_str[5:7].isdigit() and fecha_str[8:].isdigit()):
+        return date.fromisoformat(fecha_str)
+    # la resta (p.ex. 2025-1-5) com sempre, amb strptime
     return datetime.strptime(fecha_str, FECHA_FMT).date()
 
 
-#funcio per validar el email amb match de regex
+#funcio per validar el email amb match de regex (compilada un sol cop)
+PATRON_EMAIL = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+
 def validar_email(email: str) -> bool:
     """Validación simple de email (no exhaustiva)."""
-    patron = r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$"
-    return re.match(patron, email) is not None
+    return PATRON_EMAIL.match(email) is not None
 
 
 
@@ -65,8 +110,9 @@ def validar_email(email: str) -> bool:
 # ---------------------------
 # Clasess
 # ---------------------------
+# Les tres classes fan servir slots (sense __dict__ per instancia) per ocupar menys memoria
 #Clase client
-@dataclass
+@dataclass(slots=True)
 class Cliente:
     id: int
     nombre: str
@@ -74,19 +120,23 @@ class Cliente:
     fecha_alta: date
 
 #Te dues funcions, una per calcular l'antiguedad en dies i l'altra per mostrar la info del client
-    def antiguedad_dias(self) -> int:
+# (hoy es pot passar ja calculat per no cridar date.today() a cada fila d'un llistat)
+    def antiguedad_dias(self, hoy: Optional[date] = None) -> int:
         """Días desde la fecha de alta hasta hoy."""
-        return (date.today() - self.fecha_alta).days
+        return ((hoy or date.today()) - self.fecha_alta).days
+
+    def formatear(self, hoy: Optional[date] = None) -> str:
+        return f"Cliente({self.id}) {self.nombre} <{self.email}> — alta: {self.fecha_alta.isoformat()} ({self.antiguedad_dias(hoy)} días)"
 
     def __str__(self) -> str:
-        return f"Cliente({self.id}) {self.nombre} <{self.email}> — alta: {self.fecha_alta.isoformat()} ({self.antiguedad_dias()} días)"
+        return self.formatear()
 
     __repr__ = __str__
 
 
 
 #clase evento
-@dataclass
+@dataclass(slots=True)
 class Evento:
     id: int
     nombre: str
@@ -94,39 +144,753 @@ class Evento:
     categoria: str
     precio: float
 #te dos funcions, una per calcular els dies fins l'event i l'altra per mostrar la info de l'event
-    def dias_hasta_evento(self) -> int:
+    def dias_hasta_evento(self, hoy: Optional[date] = None) -> int:
         """Días desde hoy hasta la fecha del evento (negativo si ya pasó)."""
-        return (self.fecha_evento - date.today()).days
+        return (self.fecha_evento - (hoy or date.today())).days
 
-    def __str__(self) -> str:
+    def formatear(self, hoy: Optional[date] = None) -> str:
         return (
             f"Evento({self.id}) {self.nombre} — {self.categoria} — fecha: {self.fecha_evento.isoformat()} "
-            f"(en {self.dias_hasta_evento()} días) — precio: {self.precio:.2f}€"
+            f"(en {self.dias_hasta_evento(hoy)} días) — precio: {self.precio:.2f}€"
         )
 
+    def __str__(self) -> str:
+        return self.formatear()
+
     __repr__ = __str__
 
 
 
 #classe venta
-@dataclass
+@dataclass(slots=True)
 class Venta:
     id: int
     cliente_id: int
     evento_id: int
     fecha_venta: date
     importe: float
-#te una funcio per mostrar la info de la venta
-    def __str__(self) -> str:
+#te una funcio per mostrar la info de la venta (hoy no es fa servir, hi es com a les altres classes)
+    def formatear(self, hoy: Optional[date] = None) -> str:
+        return self.formatear_fila(self.id, self.cliente_id, self.evento_id, self.fecha_venta, self.importe)
+
+#funcio per formatejar els camps d'una venta sense crear l'objecte (les files del binari)
+    @staticmethod
+    def formatear_fila(id: int, cliente_id: int, evento_id: int, fecha_venta: date, importe: float) -> str:
         return (
-            f"Venta({self.id}) cliente={self.cliente_id} evento={self.evento_id} "
-            f"fecha={self.fecha_venta.isoformat()} importe={self.importe:.2f}€"
+            f"Venta({id}) cliente={cliente_id} evento={evento_id} "
+            f"fecha={fecha_venta.isoformat()} importe={importe:.2f}€"
         )
 
+    def __str__(self) -> str:
+        return self.formatear()
+
     __repr__ = __str__
 
 
 
+#classe per guardar les ventes en columnes (array) en lloc d'una llista d'objectes
+class ColumnasVentas:
+    """Tabla de ventas en columnas contiguas tipadas (módulo array).
+    Se comporta como una secuencia de Venta (iterar, len, índice, append)
+    pero guarda cada campo en su propio array y permite cálculos en bloque.
+    Las fechas se guardan como ordinal (date.toordinal()).
+    """
+
+    def __init__(self):
+        self.ids = array('q')
+        self.cliente_ids = array('q')
+        self.evento_ids = array('q')
+        self.fechas = array('l')
+        self.importes = array('d')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> Venta:
+        return Venta(
+            id=self.ids[i],
+            cliente_id=self.cliente_ids[i],
+            evento_id=self.evento_ids[i],
+            fecha_venta=date.fromordinal(self.fechas[i]),
+            importe=self.importes[i],
+        )
+
+    def __iter__(self) -> Iterator[Venta]:
+        for i in range(len(self.ids)):
+            yield self[i]
+
+    def append(self, v: Venta) -> None:
+        self.ids.append(v.id)
+        self.cliente_ids.append(v.cliente_id)
+        self.evento_ids.append(v.evento_id)
+        self.fechas.append(v.fecha_venta.toordinal())
+        self.importes.append(v.importe)
+
+    def extend_filas(self, filas: Sequence[Tuple[int, int, int, date, float]]) -> None:
+        """Añade un bloque de filas (tuplas del lector por bloques) sin crear objetos Venta."""
+        self.ids.extend(f[0] for f in filas)
+        self.cliente_ids.extend(f[1] for f in filas)
+        self.evento_ids.extend(f[2] for f in filas)
+        self.fechas.extend(f[3].toordinal() for f in filas)
+        self.importes.extend(f[4] for f in filas)
+
+    def clear(self) -> None:
+        for col in (self.ids, self.cliente_ids, self.evento_ids, self.fechas, self.importes):
+            del col[:]
+
+#calculs en bloc sobre les columnes
+    def total_importes(self) -> float:
+        return math.fsum(self.importes)
+
+    # amb numpy es fa amb bincount sobre les columnes (sense copiar-les); si no, una sola passada
+    # on cada clau acumula [num_ventas, total] alhora
+    @staticmethod
+    def _agrupar(claves: array, importes: array) -> Dict[int, Tuple[int, float]]:
+        if np is not None and len(claves):
+            c = np.frombuffer(claves, dtype=np.int64)
+            # bincount fa un comptador per cada valor fins al maxim: nomes si les claus son petites
+            if c.min() >= 0 and c.max() <= 4 * len(c) + 1024:
+                num = np.bincount(c)
+                totales = np.bincount(c, weights=np.frombuffer(importes, dtype=np.float64))
+                presentes = np.flatnonzero(num)
+                return dict(zip(presentes.tolist(), zip(num[presentes].tolist(), totales[presentes].tolist())))
+        acumulado: Dict[int, List] = {}
+        for clave, importe in zip(claves, importes):
+            celda = acumulado.get(clave)
+            if celda is None:
+                acumulado[clave] = [1, importe]
+            else:
+                celda[0] += 1
+                celda[1] += importe
+        return {clave: (num, total) for clave, (num, total) in acumulado.items()}
+
+    def ingresos_por_evento(self) -> Dict[int, Tuple[int, float]]:
+        """evento_id -> (num_ventas, total) recorriendo solo dos columnas."""
+        return self._agrupar(self.evento_ids, self.importes)
+
+    def ingresos_por_cliente(self) -> Dict[int, Tuple[int, float]]:
+        """cliente_id -> (num_ventas, total) recorriendo solo dos columnas."""
+        return self._agrupar(self.cliente_ids, self.importes)
+
+
+
+#classe index de ventes ordenat per data
+class IndiceFechasVentas:
+    """Índice de ventas ordenado por fecha_venta.
+    Guarda las posiciones de cada venta dentro de BD.ventas ordenadas por fecha
+    (ordinal), de forma que una consulta por rango es un bisect + slice
+    (O(log n + k)). Los ingresos por ventana salen de CuboIngresos.
+    Las dos columnas son arrays (como ColumnasVentas), sin un int por fila.
+    """
+
+    def __init__(self):
+        self.fechas = array('l')        # ordinals ordenats
+        self.posiciones = array('q')    # posicio de la venta a BD.ventas
+
+    def __len__(self) -> int:
+        return len(self.fechas)
+
+    def reconstruir(self, fechas: Sequence[int]) -> None:
+        """Ordena de cero a partir de la columna fecha (ordinal)."""
+        orden = sorted(range(len(fechas)), key=fechas.__getitem__)
+        self.fechas = array('l', map(fechas.__getitem__, orden))
+        self.posiciones = array('q', orden)
+
+    def insertar(self, posicion: int, fecha: int) -> None:
+        """Inserta manteniendo el orden (si va al final, caso habitual, es O(1))."""
+        k = bisect_right(self.fechas, fecha)
+        self.fechas.insert(k, fecha)
+        self.posiciones.insert(k, posicion)
+
+    def _limites(self, f_ini: date, f_fin: date) -> Tuple[int, int]:
+        return bisect_left(self.fechas, f_ini.toordinal()), bisect_right(self.fechas, f_fin.toordinal())
+
+    def rango(self, f_ini: date, f_fin: date) -> array:
+        """Posiciones de las ventas con f_ini <= fecha <= f_fin, ordenadas por fecha."""
+        lo, hi = self._limites(f_ini, f_fin)
+        return self.posiciones[lo:hi]
+
+
+class CalendarioEventos:
+    """Eventos ordenados por fecha_evento.
+    Guarda los ordinales de las fechas en una lista ordenada junto a los eventos,
+    de forma que el próximo evento o los eventos de una ventana de fechas son un
+    bisect (O(log n + k)) en lugar de recorrer u ordenar todos los eventos.
+    """
+
+    def __init__(self):
+        self.fechas: List[int] = []        # ordinals ordenats
+        self.eventos: List[Evento] = []    # events en el mateix ordre
+
+    def __len__(self) -> int:
+        return len(self.fechas)
+
+    def reconstruir(self, eventos: Iterable[Evento]) -> None:
+        """Ordena de cero (a igual fecha se mantiene el orden de entrada)."""
+        self.eventos = sorted(eventos, key=lambda e: e.fecha_evento)
+        self.fechas = [e.fecha_evento.toordinal() for e in self.eventos]
+
+    def insertar(self, e: Evento) -> None:
+        fecha = e.fecha_evento.toordinal()
+        k = bisect_right(self.fechas, fecha)
+        self.fechas.insert(k, fecha)
+        self.eventos.insert(k, e)
+
+    def proximo(self, desde: date) -> Optional[Evento]:
+        """Primer evento con fecha >= desde, o None si no hay."""
+        k = bisect_left(self.fechas, desde.toordinal())
+        return self.eventos[k] if k < len(self.eventos) else None
+
+    def entre(self, f_ini: date, f_fin: date) -> List[Evento]:
+        """Eventos con f_ini <= fecha <= f_fin, ordenados por fecha."""
+        lo = bisect_left(self.fechas, f_ini.toordinal())
+        hi = bisect_right(self.fechas, f_fin.toordinal())
+        return self.eventos[lo:hi]
+
+
+
+#classe amb els ingressos agregats per dia, mes i categoria (cub)
+class CuboIngresos:
+    """Rollup de ventas: (num_ventas, total) por día, por mes y por categoría.
+    Los totales de una ventana de fechas salen de sumas acumuladas densas (un
+    hueco por día entre el primer y el último), así que cuestan O(1); las sumas
+    se rehacen en O(días) la primera consulta después de un insert.
+    """
+
+    TODAS = None  # clau de categoria per al total de totes les categories
+
+    def __init__(self):
+        # categoria (o TODAS) -> ordinal del dia -> [num_ventas, total]
+        self.por_dia: Dict[Optional[str], Dict[int, List[float]]] = {}
+        # categoria (o TODAS) -> (any, mes) -> [num_ventas, total]
+        self.por_mes: Dict[Optional[str], Dict[Tuple[int, int], List[float]]] = {}
+        # categoria -> (primer dia, acumulat de num, acumulat de total)
+        self._acumulados: Dict[Optional[str], Tuple[int, List[int], List[float]]] = {}
+
+    def reconstruir(self, filas: Iterable[Tuple[int, str, float]]) -> None:
+        """filas: (fecha ordinal, categoria, importe) de todas las ventas."""
+        self.por_dia.clear(); self.por_mes.clear(); self._acumulados.clear()
+        for ordinal, categoria, importe in filas:
+            for clave in (self.TODAS, categoria):
+                celda = self.por_dia.setdefault(clave, {}).setdefault(ordinal, [0, 0.0])
+                celda[0] += 1
+                celda[1] += importe
+        # els mesos surten dels dies (n'hi ha molts menys que ventes)
+        for clave, dias in self.por_dia.items():
+            meses = self.por_mes.setdefault(clave, {})
+            for ordinal, (num, total) in dias.items():
+                d = date.fromordinal(ordinal)
+                celda = meses.setdefault((d.year, d.month), [0, 0.0])
+                celda[0] += num
+                celda[1] += total
+
+    def agregar(self, fecha: date, categoria: str, importe: float) -> None:
+        for clave in (self.TODAS, categoria):
+            self._sumar(clave, fecha, 1, importe)
+
+    def mover(self, fecha: date, origen: str, destino: str, importe: float) -> None:
+        """Pasa una venta de la categoría origen a destino (el total de todas no cambia)."""
+        self._sumar(origen, fecha, -1, -importe)
+        self._sumar(destino, fecha, 1, importe)
+
+    # les celles (i les categories) que es queden sense ventes s'esborren, com si es reconstruis
+    def _sumar(self, clave: Optional[str], fecha: date, num: int, importe: float) -> None:
+        for tabla, k in ((self.por_dia, fecha.toordinal()), (self.por_mes, (fecha.year, fecha.month))):
+            celdas = tabla.setdefault(clave, {})
+            celda = celdas.setdefault(k, [0, 0.0])
+            celda[0] += num
+            celda[1] += importe
+            if celda[0] == 0:
+                del celdas[k]
+                if not celdas:
+                    del tabla[clave]
+        self._acumulados.pop(clave, None)
+
+    def _acumulado(self, categoria: Optional[str]) -> Optional[Tuple[int, List[int], List[float]]]:
+        if categoria not in self._acumulados:
+            dias = self.por_dia.get(categoria)
+            if not dias:
+                return None
+            primero, ultimo = min(dias), max(dias)
+            nums, totales = [0], [0.0]
+            for ordinal in range(primero, ultimo + 1):
+                num, total = dias.get(ordinal, (0, 0.0))
+                nums.append(nums[-1] + num)
+                totales.append(totales[-1] + total)
+            self._acumulados[categoria] = (primero, nums, totales)
+        return self._acumulados[categoria]
+
+    def ventana(self, f_ini: date, f_fin: date, categoria: Optional[str] = None) -> Tuple[int, float]:
+        """(num_ventas, total) entre las dos fechas (inclusive), opcionalmente de una categoría."""
+        acumulado = self._acumulado(categoria)
+        if acumulado is None or f_ini > f_fin:
+            return 0, 0.0
+        primero, nums, totales = acumulado
+        lo = min(max(f_ini.toordinal() - primero, 0), len(nums) - 1)
+        hi = min(max(f_fin.toordinal() - primero + 1, 0), len(nums) - 1)
+        return nums[hi] - nums[lo], totales[hi] - totales[lo]
+
+    def mensual(self, categoria: Optional[str] = None) -> List[Tuple[int, int, int, float]]:
+        """[(año, mes, num_ventas, total), ...] ordenado por mes."""
+        return [(anyo, mes, num, total)
+                for (anyo, mes), (num, total) in sorted(self.por_mes.get(categoria, {}).items())]
+
+    def categorias(self) -> List[str]:
+        return sorted(c for c in self.por_dia if c is not self.TODAS)
+
+
+
+#classe per llegir ventes d'un fitxer binari d'amplada fixa amb mmap
+class VentasMmap:
+    """Fichero binario de ventas con registros de tamaño fijo ordenados por fecha,
+    leído con mmap (solo lectura). Varios procesos que abran el mismo fichero
+    comparten las páginas de la caché del sistema.
+    Formato: cabecera (magic, num_registros) + registros
+    (id, cliente_id, evento_id, fecha ordinal, importe) en little-endian.
+    """
+
+    MAGIC = b'VENTAS01'
+    CABECERA = struct.Struct('<8sq')
+    REGISTRO = struct.Struct('<qqqid')
+    _FECHA = struct.Struct('<i')
+    _OFFSET_FECHA = 24  # bytes dins el registre on comenca la data
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._fh = open(ruta, 'rb')
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap no accepta fitxers buits
+            self._fh.close()
+            raise ValueError(f"{ruta}: fichero binario de ventas vacío")
+        self._vista = memoryview(self._mm)
+        if len(self._mm) < self.CABECERA.size:
+            self.cerrar()
+            raise ValueError(f"{ruta}: fichero binario de ventas sin cabecera completa")
+        magic, self.num = self.CABECERA.unpack_from(self._vista, 0)
+        if magic != self.MAGIC:
+            self.cerrar()
+            raise ValueError(f"{ruta}: no es un fichero binario de ventas")
+        # un fitxer tallat (o amb bytes de mes) faria petar les consultes a mitges
+        if self.num < 0 or len(self._mm) != self.CABECERA.size + self.num * self.REGISTRO.size:
+            self.cerrar()
+            raise ValueError(f"{ruta}: la cabecera indica {self.num} registros y el tamaño no coincide")
+
+    def __len__(self) -> int:
+        return self.num
+
+    def __enter__(self) -> VentasMmap:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+    def cerrar(self) -> None:
+        self._vista.release()
+        self._mm.close()
+        self._fh.close()
+
+    @classmethod
+    def escribir(cls, ruta: str, registros: Iterator[Tuple[int, int, int, int, float]], num: int) -> None:
+        """Escribe num registros (ya ordenados por fecha ordinal) de forma atómica."""
+        tmp = ruta + '.tmp'
+        with open(tmp, 'wb') as fh:
+            fh.write(cls.CABECERA.pack(cls.MAGIC, num))
+            for r in registros:
+                fh.write(cls.REGISTRO.pack(*r))
+        os.replace(tmp, ruta)
+
+#cerca binaria sobre la data de cada registre directament al mmap
+    def _buscar(self, ordinal: int, derecha: bool) -> int:
+        lo, hi = 0, self.num
+        base = self.CABECERA.size + self._OFFSET_FECHA
+        tam = self.REGISTRO.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f = self._FECHA.unpack_from(self._vista, base + mid * tam)[0]
+            if f < ordinal or (derecha and f == ordinal):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def filas_rango(self, f_ini: date, f_fin: date) -> Iterator[Tuple[int, int, int, int, float]]:
+        """Tuplas (id, cliente_id, evento_id, fecha ordinal, importe) del rango, sin copiar el bloque."""
+        lo = self._buscar(f_ini.toordinal(), False)
+        hi = self._buscar(f_fin.toordinal(), True)
+        inicio = self.CABECERA.size + lo * self.REGISTRO.size
+        fin = self.CABECERA.size + hi * self.REGISTRO.size
+        return self.REGISTRO.iter_unpack(self._vista[inicio:fin])
+
+    def ingresos(self, f_ini: date, f_fin: date) -> float:
+        return math.fsum(r[4] for r in self.filas_rango(f_ini, f_fin))
+
+
+
+
+
+
+
+
+# ------------------------------------
+# Lectura dels CSV per blocs (streaming)
+# ------------------------------------
+#funcions per convertir una fila (ja en l'ordre de CAMPOS_*) en una tupla tipada
+# (les dates surten de la cache de parse_fecha, aixi les files amb la mateixa data comparteixen l'objecte)
+def _convertir_cliente(fila: Sequence[str]) -> Tuple[int, str, str, date]:
+    return (int(fila[0]), fila[1].strip(), fila[2].strip(), parse_fecha(fila[3].strip()))
+
+def _convertir_evento(fila: Sequence[str]) -> Tuple[int, str, date, str, float]:
+    # la categoria es repeteix molt: s'interna per compartir un sol objecte str
+    return (int(fila[0]), fila[1].strip(), parse_fecha(fila[2].strip()), sys.intern(fila[3].strip()), float(fila[4]))
+
+def _convertir_venta(fila: Sequence[str]) -> Tuple[int, int, int, date, float]:
+    return (int(fila[0]), int(fila[1]), int(fila[2]), parse_fecha(fila[3].strip()), float(fila[4]))
+
+
+#error quan a la capcalera d'un csv li falten columnes (no es pot llegir cap fila)
+class CabeceraInvalida(ValueError):
+    pass
+
+
+#funcio per trobar la posicio de cada columna esperada dins la capcalera
+def _posiciones_cabecera(tabla: str, cabecera: List[str]) -> List[int]:
+    campos = ESQUEMAS[tabla][0]
+    # les columnes es busquen per nom, com feia el DictReader
+    cabecera = [c.strip() for c in cabecera]
+    faltan = [c for c in campos if c not in cabecera]
+    if faltan:
+        raise CabeceraInvalida(f"[{tabla}.csv] Faltan columnas: {faltan}")
+    return [cabecera.index(c) for c in campos]
+
+
+# tabla -> (columnes esperades, funcio de conversio)
+ESQUEMAS: Dict[str, Tuple[List[str], Callable[[Sequence[str]], tuple]]] = {
+    'clientes': (CAMPOS_CLIENTES, _convertir_cliente),
+    'eventos': (CAMPOS_EVENTOS, _convertir_evento),
+    'ventas': (CAMPOS_VENTAS, _convertir_venta),
+}
+
+
+#funcio generadora per llegir un csv per blocs de tuples amb memoria constant
+def leer_csv_por_bloques(
+    ruta: str,
+    tabla: str,
+    tam_bloque: int = TAM_BLOQUE,
+    progreso: Optional[Callable[[str, int], None]] = None,
+    al_error: Optional[Callable[[int, List[str], Exception], None]] = None,
+) -> Iterator[List[tuple]]:
+    """Lee el CSV de la tabla indicada y va devolviendo listas de como mucho
+    tam_bloque tuplas ya convertidas (sin crear un dict por fila).
+    - progreso(tabla, filas_leidas) se llama después de cada bloque.
+    - al_error(num_linea, fila, error) se llama por cada fila inválida (que se omite).
+    Lanza FileNotFoundError si el fichero no existe.
+    """
+    campos, convertir = ESQUEMAS[tabla]
+    # utf-8-sig per si el csv porta BOM (com la lectura en paral·lel)
+    with open(ruta, newline='', encoding='utf-8-sig') as fh:
+        reader = csv.reader(fh)
+        cabecera = next(reader, None)
+        if cabecera is None:
+            return
+        posiciones = _posiciones_cabecera(tabla, cabecera)
+
+        bloque: List[tuple] = []
+        leidas = 0
+        for num_linea, fila in enumerate(reader, start=2):
+            if not fila:
+                continue
+            leidas += 1
+            try:
+                bloque.append(convertir([fila[i] for i in posiciones]))
+            except Exception as e:
+                if al_error is not None:
+                    al_error(num_linea, fila, e)
+                continue
+            if len(bloque) >= tam_bloque:
+                yield bloque
+                bloque = []
+                if progreso is not None:
+                    progreso(tabla, leidas)
+        if bloque:
+            yield bloque
+        if progreso is not None:
+            progreso(tabla, leidas)
+
+
+#funcio per partir un csv en trossos de bytes que comencen i acaben en final de linia
+# (Practica3/Practica_3.py en te una copia sense capcalera: els canvis s'han de fer als dos)
+def rangos_por_lineas(ruta: str, partes: int) -> Tuple[str, List[Tuple[int, int]]]:
+    """Devuelve (cabecera, [(inicio, fin), ...]) con los rangos de bytes de los datos.
+    Cada corte se desplaza hasta el siguiente salto de línea para no partir filas
+    (no soporta campos entrecomillados con saltos de línea dentro).
+    """
+    total = os.path.getsize(ruta)
+    with open(ruta, 'rb') as fh:
+        cabecera = fh.readline()
+        cortes = [fh.tell()]
+        for k in range(1, partes):
+            pos = cortes[0] + (total - cortes[0]) * k // partes
+            if pos <= cortes[-1]:
+                continue
+            fh.seek(pos - 1)
+            fh.readline()
+            if fh.tell() >= total:
+                break
+            cortes.append(fh.tell())
+    cortes.append(total)
+    rangos = [(ini, fin) for ini, fin in zip(cortes, cortes[1:]) if fin > ini]
+    return cabecera.decode('utf-8-sig'), rangos
+
+
+#funcio que executa cada proces: parseja un tros de bytes del csv
+def _parsear_rango(ruta: str, tabla: str, cabecera: str, inicio: int, fin: int
+                   ) -> Tuple[List[tuple], List[Tuple[int, List[str], Exception]], int]:
+    """Devuelve (filas, errores, num_lineas). Los errores llevan el número de
+    línea relativo al trozo; quien junta los trozos lo pasa a absoluto.
+    """
+    convertir = ESQUEMAS[tabla][1]
+    posiciones = _posiciones_cabecera(tabla, next(csv.reader([cabecera])))
+    with open(ruta, 'rb') as fh:
+        fh.seek(inicio)
+        texto = fh.read(fin - inicio).decode('utf-8')
+    filas: List[tuple] = []
+    errores: List[Tuple[int, List[str], Exception]] = []
+    for num_linea, fila in enumerate(csv.reader(io.StringIO(texto, newline='')), start=0):
+        if not fila:
+            continue
+        try:
+            filas.append(convertir([fila[i] for i in posiciones]))
+        except Exception as e:
+            errores.append((num_linea, fila, e))
+    return filas, errores, texto.count('\n')
+
+
+#funcio generadora per llegir un csv gran repartint els trossos en un pool de processos
+def leer_csv_paralelo(
+    ruta: str,
+    tabla: str,
+    procesos: Optional[int] = None,
+    progreso: Optional[Callable[[str, int], None]] = None,
+    al_error: Optional[Callable[[int, List[str], Exception], None]] = None,
+) -> Iterator[List[tuple]]:
+    """Misma interfaz que leer_csv_por_bloques, pero cada bloque es un trozo del
+    fichero parseado en otro proceso. Los bloques salen en el orden del fichero.
+    Si el fichero es pequeño (< TAM_MIN_PARALELO) se lee en serie.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or os.path.getsize(ruta) < TAM_MIN_PARALELO:
+        yield from leer_csv_por_bloques(ruta, tabla, progreso=progreso, al_error=al_error)
+        return
+    cabecera, rangos = rangos_por_lineas(ruta, procesos * 4)
+    if not cabecera.strip():
+        return
+    _posiciones_cabecera(tabla, next(csv.reader([cabecera])))
+    leidas = 0
+    linea_base = 2  # la linia 1 es la capcalera
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        trozos = pool.map(_parsear_rango, *zip(*[(ruta, tabla, cabecera, ini, fin) for ini, fin in rangos]))
+        for filas, errores, num_lineas in trozos:
+            if al_error is not None:
+                for num_linea, fila, e in errores:
+                    al_error(linea_base + num_linea, fila, e)
+            linea_base += num_lineas
+            leidas += len(filas) + len(errores)
+            if filas:
+                yield filas
+            if progreso is not None:
+                progreso(tabla, leidas)
+
+
+#funcio generadora per llegir clients nous (nombre, email, fecha) per lots d'un CSV o JSONL
+# (les files que no tenen la forma esperada surten com a None)
+def _leer_lotes_clientes(ruta: str, tam_lote: int) -> Iterator[List[Optional[Tuple[str, str, str]]]]:
+    with open(ruta, newline='', encoding='utf-8-sig') as fh:
+        if ruta.lower().endswith(('.jsonl', '.json')):
+            filas = (json.loads(linea) for linea in fh if linea.strip())
+            filas = ((str(o.get('nombre', '')), str(o.get('email', '')), str(o.get('fecha_alta', '')))
+                     if isinstance(o, dict) else None for o in filas)
+        else:
+            reader = csv.reader(fh)
+            cabecera = [c.strip() for c in next(reader, [])]
+            faltan = [c for c in ('nombre', 'email', 'fecha_alta') if c not in cabecera]
+            if faltan:
+                raise ValueError(f"Faltan columnas: {faltan}")
+            i_nom, i_email, i_fecha = (cabecera.index(c) for c in ('nombre', 'email', 'fecha_alta'))
+            filas = ((f[i_nom], f[i_email], f[i_fecha]) if len(f) == len(cabecera) else None
+                     for f in reader if f)
+        lote: List[Optional[Tuple[str, str, str]]] = []
+        for fila in filas:
+            lote.append(None if fila is None else tuple(c.strip() for c in fila))
+            if len(lote) >= tam_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+
+#funcio per calcular el resum per event directament del csv de ventes (sense carregar-lo)
+def resumen_por_evento_csv(ruta_ventas: str, tam_bloque: int = TAM_BLOQUE,
+                           progreso: Optional[Callable[[str, int], None]] = None) -> Dict[int, Tuple[int, float]]:
+    """evento_id -> (num_ventas, total) con memoria proporcional al número de eventos."""
+    num: Dict[int, int] = defaultdict(int)
+    totales: Dict[int, float] = defaultdict(float)
+    for bloque in leer_csv_por_bloques(ruta_ventas, 'ventas', tam_bloque, progreso):
+        for _, _, ev_id, _, importe in bloque:
+            num[ev_id] += 1
+            totales[ev_id] += importe
+    return {ev_id: (num[ev_id], totales[ev_id]) for ev_id in num}
+
+
+
+
+
+
+
+
+
+
+#funcio per classificar l'error d'una fila invalida (per agrupar-los al resum)
+def tipo_error_fila(e: Exception) -> str:
+    if isinstance(e, IndexError):
+        return 'faltan_columnas'
+    msg = str(e)
+    if msg.startswith('invalid literal for int'):
+        return 'entero_invalido'
+    if msg.startswith('could not convert string to float'):
+        return 'decimal_invalido'
+    if ('does not match format' in msg or 'unconverted data' in msg or 'out of range' in msg
+            or 'must be in' in msg):
+        return 'fecha_invalida'
+    return type(e).__name__
+
+
+class Cuarentena:
+    """Guarda las filas inválidas de una tabla en un CSV aparte (línea, tipo de
+    error, detalle y fila original), escribiendo por bloques, y cuenta los
+    errores por tipo para mostrar solo un resumen por pantalla.
+    """
+
+    CAMPOS = ['linea', 'tipo_error', 'detalle', 'fila']
+
+    def __init__(self, ruta: str, tabla: str, tam_bloque: int = TAM_BLOQUE):
+        self.ruta = ruta
+        self.tabla = tabla
+        self.tam_bloque = tam_bloque
+        self.por_tipo: Counter = Counter()
+        self._pendientes: List[list] = []
+        self._fh = None
+        self._writer = None
+        self._buffer = io.StringIO()
+        self._writer_fila = csv.writer(self._buffer, lineterminator='')
+
+    def anotar(self, num_linea: int, fila: List[str], e: Exception) -> None:
+        tipo = tipo_error_fila(e)
+        self.por_tipo[tipo] += 1
+        self._pendientes.append([num_linea, tipo, str(e), self._linea_original(fila)])
+        if len(self._pendientes) >= self.tam_bloque:
+            self._volcar()
+
+    # la fila es torna a escriure com a csv (amb cometes si cal) per poder-la recuperar tal qual
+    def _linea_original(self, fila: List[str]) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer_fila.writerow(fila)
+        return self._buffer.getvalue()
+
+    def _volcar(self) -> None:
+        if self._fh is None:
+            self._fh = open(self.ruta, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._fh)
+            self._writer.writerow(self.CAMPOS)
+        self._writer.writerows(self._pendientes)
+        self._pendientes.clear()
+
+    def cerrar(self) -> None:
+        """Escribe lo pendiente. Si no ha habido errores borra la cuarentena de una carga anterior."""
+        if self._pendientes:
+            self._volcar()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        elif os.path.exists(self.ruta):
+            os.remove(self.ruta)
+
+    def mostrar(self) -> None:
+        if not self.por_tipo:
+            return
+        print(f"[{self.tabla}.csv] {sum(self.por_tipo.values())} filas inválidas omitidas (ver {self.ruta}):")
+        for tipo, num in sorted(self.por_tipo.items()):
+            print(f"  {tipo}: {num}")
+
+
+# ------------------------------------
+# Instrumentacio (temps i files per operacio)
+# ------------------------------------
+
+class Metricas:
+    """Acumula, por operación, llamadas, segundos y filas escaneadas/devueltas."""
+
+    def __init__(self):
+        self.datos: Dict[str, Dict[str, float]] = {}
+        # una entrada [escanejades, retornades] per cada operacio en curs (poden niar-se)
+        self._pila: List[List[int]] = []
+
+    def contar(self, escaneadas: int = 0, devueltas: int = 0) -> None:
+        if self._pila:
+            self._pila[-1][0] += escaneadas
+            self._pila[-1][1] += devueltas
+
+    def registrar(self, operacion: str, segundos: float, escaneadas: int, devueltas: int) -> None:
+        d = self.datos.setdefault(operacion, {'llamadas': 0, 'segundos': 0.0, 'filas_escaneadas': 0, 'filas_devueltas': 0})
+        d['llamadas'] += 1
+        d['segundos'] += segundos
+        d['filas_escaneadas'] += escaneadas
+        d['filas_devueltas'] += devueltas
+
+    def reiniciar(self) -> None:
+        self.datos.clear()
+
+    def mostrar(self) -> None:
+        print("\n=== MÉTRICAS ===")
+        if not self.datos:
+            print("Sin operaciones registradas.")
+            return
+        print(f"{'operación':28} {'llamadas':>8} {'segundos':>10} {'escaneadas':>12} {'devueltas':>12}")
+        for op, d in sorted(self.datos.items(), key=lambda x: -x[1]['segundos']):
+            print(f"{op:28} {d['llamadas']:8d} {d['segundos']:10.4f} {d['filas_escaneadas']:12d} {d['filas_devueltas']:12d}")
+
+    def volcar(self, ruta: str) -> None:
+        """Escribe las métricas en JSON para poder procesarlas."""
+        with open(ruta, 'w', encoding='utf-8') as fh:
+            json.dump({op: dict(d) for op, d in sorted(self.datos.items())}, fh, indent=2, ensure_ascii=False)
+
+
+#decorador per mesurar un metode de BD; si bd.metricas es None nomes crida el metode
+def instrumentado(func: Callable) -> Callable:
+    operacion = func.__name__
+
+    @functools.wraps(func)
+    def envoltorio(self, *args, **kwargs):
+        metricas = self.metricas
+        if metricas is None:
+            return func(self, *args, **kwargs)
+        metricas._pila.append([0, 0])
+        t0 = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            segundos = time.perf_counter() - t0
+            escaneadas, devueltas = metricas._pila.pop()
+            metricas.registrar(operacion, segundos, escaneadas, devueltas)
+            # les files de les operacions internes tambe compten per la de fora
+            metricas.contar(escaneadas, devueltas)
+
+    return envoltorio
+
+
+
 
 
 
@@ -141,26 +905,67 @@ class Venta:
 class BD:
     """Estructura de datos en memoria y utilidades de acceso/índices."""
 
-    def __init__(self):
+    def __init__(self, columnar: bool = False, append_clientes: bool = True, instrumentar: bool = False):
         # Llistes q utilitzo
         self.clientes: List[Cliente] = []
         self.eventos: List[Evento] = []
-        self.ventas: List[Venta] = []
+        # amb columnar=True les ventes es guarden en arrays (menys memoria, calculs en bloc)
+        self.columnar = columnar
+        self.ventas: Union[List[Venta], ColumnasVentas] = ColumnasVentas() if columnar else []
 
-        # index er id per accedir mes rapid
+        # index er id per accedir mes rapid (en mode columnar idx_ventas queda buit)
         self.idx_clientes: Dict[int, Cliente] = {}
         self.idx_eventos: Dict[int, Evento] = {}
         self.idx_ventas: Dict[int, Venta] = {}
+        # index email (casefold) -> client, per comprovar duplicats en O(1)
+        self.idx_email: Dict[str, Cliente] = {}
+        # id mes alt de cada taula, per donar ids nous sense recorrer res
+        self._max_id: Dict[str, int] = {'clientes': 0, 'eventos': 0, 'ventas': 0}
+        # agregats materialitzats de ventes: es calculen al carregar i s'actualitzen a cada insert
+        self.agg_total: float = 0.0
+        self.agg_por_evento: Dict[int, Tuple[int, float]] = {}   # evento_id -> (num_ventas, total)
+        self.agg_por_cliente: Dict[int, Tuple[int, float]] = {}  # cliente_id -> (num_ventas, total)
+        self.categorias: Set[str] = set()
+        # index de ventes ordenat per fecha_venta (per consultes per rang)
+        self.idx_fechas_ventas = IndiceFechasVentas()
+        # index secundaris de ventes: cliente_id / evento_id -> posicions a self.ventas
+        self.idx_ventas_cliente: Dict[int, array] = {}
+        self.idx_ventas_evento: Dict[int, array] = {}
+        # ingressos per dia / mes / categoria, amb acumulats per finestres de dates
+        self.cubo_ingresos = CuboIngresos()
+        # files invalides de l'ultima carga: tabla -> {tipo_error: num}
+        self.filas_invalidas: Dict[str, Dict[str, int]] = {}
+        # events ordenats per data (proxim event, events d'una finestra i llistat)
+        self.calendario_eventos = CalendarioEventos()
 
         # Rutes dels arxius CSV
         self.dir_data = os.path.join("data")
         self.f_clientes = os.path.join(self.dir_data, "clientes.csv")
         self.f_eventos = os.path.join(self.dir_data, "eventos.csv")
         self.f_ventas = os.path.join(self.dir_data, "ventas.csv")
+        self.f_snapshot = os.path.join(self.dir_data, "bd.snapshot")
+        self.f_ventas_bin = os.path.join(self.dir_data, "ventas.bin")
+        # si esta obert, les consultes per rang es fan sobre el binari amb mmap
+        self.ventas_mmap: Optional[VentasMmap] = None
 
         # aixo garantitza que el directori data existeixi
         os.makedirs(self.dir_data, exist_ok=True)
 
+        # amb append_clientes=True les altes s'afegeixen al final de clientes.csv (journal)
+        # en lloc de reescriure tot el fitxer; compactar_clientes() el torna a escriure net
+        self.append_clientes = append_clientes
+        self._fh_journal = None
+        self._journal_pendientes = 0   # linies escrites sense fsync
+        self._journal_lineas = 0       # linies afegides des de l'ultima compactacio
+
+        # metriques de cada operacio (None = desactivat, no costa res)
+        self.metricas: Optional[Metricas] = Metricas() if instrumentar else None
+        self.f_metricas = os.path.join(self.dir_data, "metricas.json")
+
+        # opcions de l'ultima carrega (en paral·lel o no)
+        self._paralelo = False
+        self._procesos: Optional[int] = None
+
 
 
 
@@ -176,86 +981,200 @@ class BD:
     # Cargar dades
     # ---------------------------
     #funcio per cargar les dades, aquesta funcio crida a les tres altre funcions per cargar cada csv
-    def cargar_datos(self) -> None:
-        """Llegeix els 3 CSV i carrega les dades a memòria. Si hi ha algun q no esta avisa per terminaol"""
-        self._leer_clientes()
-        self._leer_eventos()
-        self._leer_ventas()
+    @instrumentado
+    def cargar_datos(self, progreso: Optional[Callable[[str, int], None]] = None,
+                     paralelo: bool = False, procesos: Optional[int] = None,
+                     snapshot: bool = False) -> None:
+        """Llegeix els 3 CSV i carrega les dades a memòria. Si hi ha algun q no esta avisa per terminaol
+        progreso(tabla, filas_leidas) es crida despres de cada bloc llegit.
+        Amb paralelo=True els csv grans es parsegen per trossos en un pool de processos.
+        Amb snapshot=True primer prova data/bd.snapshot i, si els csv han canviat, els llegeix i el refa.
+        """
+        self._paralelo = paralelo
+        self._procesos = procesos
+        self._cerrar_journal()
+        self.cerrar_ventas_binario()
+        if snapshot and self._cargar_snapshot():
+            print("\nCarga completada (snapshot).")
+            return
+        self._leer_clientes(progreso)
+        self._leer_eventos(progreso)
+        self._leer_ventas(progreso)
+        self._reconstruir_indices_ventas()
+        if snapshot:
+            self._guardar_snapshot()
         print("\nCarga completada.")
 
 
+    # ---------------------------
+    # Snapshot binari
+    # ---------------------------
+    # atributs de la BD que es guarden (taules + index ja construits)
+    _ATRIBUTOS_SNAPSHOT = (
+        'clientes', 'eventos', 'ventas', 'idx_clientes', 'idx_eventos', 'idx_ventas',
+        'idx_email', '_max_id', 'agg_total', 'agg_por_evento', 'agg_por_cliente', 'categorias',
+        'idx_fechas_ventas', 'cubo_ingresos', 'idx_ventas_cliente', 'idx_ventas_evento',
+        'calendario_eventos',
+    )
+
+#funcio per obtenir la clau de l'snapshot: mida i mtime de cada csv
+    def _clave_snapshot(self) -> tuple:
+        clave = [SNAPSHOT_VERSION, self.columnar]
+        for ruta in (self.f_clientes, self.f_eventos, self.f_ventas):
+            try:
+                st = os.stat(ruta)
+                clave.append((st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                clave.append(None)
+        return tuple(clave)
+
+#funcio per guardar l'snapshot de forma atomica
+    def _guardar_snapshot(self) -> None:
+        estado = {nombre: getattr(self, nombre) for nombre in self._ATRIBUTOS_SNAPSHOT}
+        tmp = self.f_snapshot + '.tmp'
+        try:
+            with open(tmp, 'wb') as fh:
+                pickle.dump((self._clave_snapshot(), estado), fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.f_snapshot)
+        except OSError as e:
+            print(f"[snapshot] No se ha podido guardar: {e}")
+
+#funcio per carregar l'snapshot si encara es valid; retorna False si s'han de llegir els csv
+    def _cargar_snapshot(self) -> bool:
+        try:
+            with open(self.f_snapshot, 'rb') as fh:
+                clave, estado = pickle.load(fh)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"[snapshot] Ignorado, no se puede leer: {e}")
+            return False
+        if clave != self._clave_snapshot() or set(estado) != set(self._ATRIBUTOS_SNAPSHOT):
+            return False
+        for nombre, valor in estado.items():
+            setattr(self, nombre, valor)
+        return True
+
+#funcio per refer els index de ventes un cop carregades
+    def _reconstruir_indices_ventas(self) -> None:
+        self._max_id['ventas'] = max(self.ventas.ids if self.columnar else self.idx_ventas, default=0)
+        self.agg_por_evento = self._calcular_resumen_por_evento()
+        self.agg_por_cliente = self._calcular_resumen_por_cliente()
+        self.agg_total = math.fsum(total for _, total in self.agg_por_evento.values())
+        if self.columnar:
+            self.idx_fechas_ventas.reconstruir(self.ventas.fechas)
+        else:
+            self.idx_fechas_ventas.reconstruir([v.fecha_venta.toordinal() for v in self.ventas])
+        self.cubo_ingresos.reconstruir(self._filas_cubo())
+        if self.columnar:
+            self.idx_ventas_cliente = self._indexar_posiciones(self.ventas.cliente_ids)
+            self.idx_ventas_evento = self._indexar_posiciones(self.ventas.evento_ids)
+        else:
+            self.idx_ventas_cliente = self._indexar_posiciones(v.cliente_id for v in self.ventas)
+            self.idx_ventas_evento = self._indexar_posiciones(v.evento_id for v in self.ventas)
+
+#funcio per agrupar les posicions de les ventes per clau (client o event)
+    @staticmethod
+    def _indexar_posiciones(claves: Iterable[int]) -> Dict[int, array]:
+        indice: Dict[int, array] = {}
+        for pos, clave in enumerate(claves):
+            posiciones = indice.get(clave)
+            if posiciones is None:
+                posiciones = indice[clave] = array('q')
+            posiciones.append(pos)
+        return indice
+
+#funcio per obtenir (fecha ordinal, categoria, importe) de cada venta per al cub d'ingressos
+    def _filas_cubo(self) -> Iterable[Tuple[int, str, float]]:
+        if self.columnar:
+            return zip(self.ventas.fechas, map(self._categoria_evento, self.ventas.evento_ids), self.ventas.importes)
+        return ((v.fecha_venta.toordinal(), self._categoria_evento(v.evento_id), v.importe) for v in self.ventas)
+
+#funcio per saber la categoria de l'event d'una venta (les ventes d'events que no existeixen van a part)
+    def _categoria_evento(self, ev_id: int) -> str:
+        ev = self.idx_eventos.get(ev_id)
+        return ev.categoria if ev else 'desconocida'
+
+
+#funcio per triar la lectura en serie o en paral·lel d'un csv
+# (les files invalides van a data/cuarentena_<tabla>.csv i per pantalla nomes surt el resum)
+    def _bloques(self, ruta: str, tabla: str, progreso=None) -> Iterator[List[tuple]]:
+        cuarentena = Cuarentena(os.path.join(self.dir_data, f"cuarentena_{tabla}.csv"), tabla)
+        if self._paralelo:
+            lector = leer_csv_paralelo(ruta, tabla, self._procesos, progreso, cuarentena.anotar)
+        else:
+            lector = leer_csv_por_bloques(ruta, tabla, progreso=progreso, al_error=cuarentena.anotar)
+        try:
+            yield from lector
+        finally:
+            cuarentena.cerrar()
+            cuarentena.mostrar()
+            self.filas_invalidas[tabla] = dict(cuarentena.por_tipo)
+
+
 #funcio per cargar els clients
-    def _leer_clientes(self):
+    @instrumentado
+    def _leer_clientes(self, progreso=None):
         #neteja les llistes i els indexs
-        self.clientes.clear(); self.idx_clientes.clear()
+        self.clientes.clear(); self.idx_clientes.clear(); self.idx_email.clear()
         try:
-            #llegeix el csv
-            with open(self.f_clientes, newline='', encoding='utf-8') as fh:
-                reader = csv.DictReader(fh)
-                for row in reader:
-                    try:
-                        c = Cliente(
-                            id=int(row['id']),
-                            nombre=row['nombre'].strip(),
-                            email=row['email'].strip(),
-                            fecha_alta=parse_fecha(row['fecha_alta'].strip()),
-                        )
-                        self.clientes.append(c)
-                        self.idx_clientes[c.id] = c
-                    except Exception as e:
-                        print(f"[clientes.csv] Fila inválida omitida: {row} — Error: {e}")
+            #llegeix el csv per blocs
+            for bloque in self._bloques(self.f_clientes, 'clientes', progreso):
+                self._contar(len(bloque), len(bloque))
+                for fila in bloque:
+                    c = Cliente(*fila)
+                    self.clientes.append(c)
+                    self.idx_clientes[c.id] = c
+                    self.idx_email.setdefault(c.email.casefold(), c)
         except FileNotFoundError:
             print("[clientes.csv] No encontrado. La tabla de clientes se inicializa vacía.")
+        except CabeceraInvalida as e:
+            print(f"{e}. La tabla de clientes se inicializa vacía.")
+        self._max_id['clientes'] = max(self.idx_clientes, default=0)
 
 
 #funci o per cargar els events
-    def _leer_eventos(self):
+    @instrumentado
+    def _leer_eventos(self, progreso=None):
         #neteja les llistes i els indexs
-        self.eventos.clear(); self.idx_eventos.clear()
+        self.eventos.clear(); self.idx_eventos.clear(); self.categorias.clear()
         try:
-            #llegeix el csv
-            with open(self.f_eventos, newline='', encoding='utf-8') as fh:
-                reader = csv.DictReader(fh)
-                for row in reader:
-                    try:
-                        e = Evento(
-                            id=int(row['id']),
-                            nombre=row['nombre'].strip(),
-                            fecha_evento=parse_fecha(row['fecha_evento'].strip()),
-                            categoria=row['categoria'].strip(),
-                            precio=float(row['precio']),
-                        )
-                        self.eventos.append(e)
-                        self.idx_eventos[e.id] = e
-                    except Exception as e:
-                        print(f"[eventos.csv] Fila inválida omitida: {row} — Error: {e}")
+            #llegeix el csv per blocs
+            for bloque in self._bloques(self.f_eventos, 'eventos', progreso):
+                self._contar(len(bloque), len(bloque))
+                for fila in bloque:
+                    e = Evento(*fila)
+                    self.eventos.append(e)
+                    self.idx_eventos[e.id] = e
+                    self.categorias.add(e.categoria)
         except FileNotFoundError:
             print("[eventos.csv] No encontrado. La tabla de eventos se inicializa vacía.")
+        except CabeceraInvalida as e:
+            print(f"{e}. La tabla de eventos se inicializa vacía.")
+        self._max_id['eventos'] = max(self.idx_eventos, default=0)
+        self.calendario_eventos.reconstruir(self.eventos)
 
 
 #funcio per cargar les ventes
-    def _leer_ventas(self):
+    @instrumentado
+    def _leer_ventas(self, progreso=None):
         #neteja les llistes i els indexs
         self.ventas.clear(); self.idx_ventas.clear()
         try:
-            #llegeix el csv
-            with open(self.f_ventas, newline='', encoding='utf-8') as fh:
-                reader = csv.DictReader(fh)
-                for row in reader:
-                    try:
-                        v = Venta(
-                            id=int(row['id']),
-                            cliente_id=int(row['cliente_id']),
-                            evento_id=int(row['evento_id']),
-                            fecha_venta=parse_fecha(row['fecha_venta'].strip()),
-                            importe=float(row['importe']),
-                        )
-                        self.ventas.append(v)
-                        self.idx_ventas[v.id] = v
-                    except Exception as e:
-                        print(f"[ventas.csv] ila inválida omitida: {row} — Error: {e}")
+            #llegeix el csv per blocs
+            for bloque in self._bloques(self.f_ventas, 'ventas', progreso):
+                self._contar(len(bloque), len(bloque))
+                if self.columnar:
+                    self.ventas.extend_filas(bloque)
+                    continue
+                for fila in bloque:
+                    v = Venta(*fila)
+                    self.ventas.append(v)
+                    self.idx_ventas[v.id] = v
         except FileNotFoundError:
             print("[ventas.csv] No encontrado. La tabla de ventas se inicializa vacía.")
+        except CabeceraInvalida as e:
+            print(f"{e}. La tabla de ventas se inicializa vacía.")
 
 
 
@@ -268,35 +1187,161 @@ class BD:
     # ---------------------------
     # Guardar dades
     # ---------------------------
-#funcio per guardar els clients
+#funcio per guardar els clients (reescriu tot el fitxer de forma atomica)
     def guardar_clientes(self) -> None:
-        with open(self.f_clientes, 'w', newline='', encoding='utf-8') as fh:
-            campos = ['id', 'nombre', 'email', 'fecha_alta']
-            writer = csv.DictWriter(fh, fieldnames=campos)
+        self._cerrar_journal()
+        tmp = self.f_clientes + '.tmp'
+        with open(tmp, 'w', newline='', encoding='utf-8') as fh:
+            writer = csv.DictWriter(fh, fieldnames=CAMPOS_CLIENTES)
             writer.writeheader()
-            for c in self.clientes:
+            for c in self._todos_clientes():
                 writer.writerow({
                     'id': c.id,
                     'nombre': c.nombre,
                     'email': c.email,
                     'fecha_alta': c.fecha_alta.isoformat(),
                 })
+            fh.flush()
+            os.fsync(fh.fileno())
+        # si peta abans d'aqui el fitxer original queda intacte
+        os.replace(tmp, self.f_clientes)
+        self._journal_lineas = 0
+
+#funcio per afegir un client al final del csv sense reescriure'l
+    def _anotar_cliente(self, c: Cliente) -> None:
+        self._anotar_clientes([c])
+
+#funcio per afegir diversos clients al final del csv d'una tirada
+    def _anotar_clientes(self, nuevos: List[Cliente]) -> None:
+        if self._fh_journal is None:
+            self._reparar_cola_clientes()
+            nuevo = not os.path.exists(self.f_clientes) or os.path.getsize(self.f_clientes) == 0
+            self._fh_journal = open(self.f_clientes, 'a', newline='', encoding='utf-8')
+            if nuevo:
+                csv.writer(self._fh_journal).writerow(CAMPOS_CLIENTES)
+        csv.writer(self._fh_journal).writerows([c.id, c.nombre, c.email, c.fecha_alta.isoformat()] for c in nuevos)
+        self._fh_journal.flush()
+        self._journal_lineas += len(nuevos)
+        self._journal_pendientes += len(nuevos)
+        if self._journal_pendientes >= FSYNC_CADA:
+            self.sincronizar_clientes()
+
+#funcio per deixar clientes.csv acabat en salt de linia abans d'afegir-hi altes
+    def _reparar_cola_clientes(self) -> None:
+        """Si la última línea no acaba en salto de línea y el cargador la acepta, se le
+        añade el salto. Si el cargador la rechaza (quedó cortada por un crash a medio
+        escribir) se copia a cuarentena_clientes.csv y se trunca el fichero hasta el
+        último salto, para que la siguiente alta no quede pegada a ella.
+        Solo se llama al abrir el journal: una carga nunca modifica el fichero.
+        """
+        try:
+            fh = open(self.f_clientes, 'r+b')
+        except FileNotFoundError:
+            return
+        with fh:
+            tam = fh.seek(0, os.SEEK_END)
+            if tam == 0:
+                return
+            fh.seek(tam - 1)
+            if fh.read(1) == b'\n':
+                return
+            # es busca l'ultim salt de linia per trossos des del final
+            corte, pos = 0, tam
+            while pos > 0:
+                ini = max(0, pos - 4096)
+                fh.seek(ini)
+                k = fh.read(pos - ini).rfind(b'\n')
+                if k >= 0:
+                    corte = ini + k + 1
+                    break
+                pos = ini
+            fh.seek(corte)
+            cola = fh.read().decode('utf-8', 'replace')
+            fh.seek(0)
+            cabecera = fh.readline().decode('utf-8-sig', 'replace').rstrip('\r\n')
+            # si corte es 0 la unica linia es la capcalera
+            error = self._error_linea_cliente(cabecera, cola) if corte else None
+            if error is None:
+                fh.seek(tam)
+                fh.write(b'\r\n')
+            else:
+                self._apartar_linea_cliente(cola, error)
+                fh.truncate(corte)
+                print(f"[clientes.csv] Última línea incompleta movida a la cuarentena: {cola!r}")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+#funcio per saber si el carregador rebutjaria una linia de clientes.csv (None si l'accepta)
+    @staticmethod
+    def _error_linea_cliente(cabecera: str, linea: str) -> Optional[Exception]:
+        fila = next(csv.reader([linea]), [])
+        if not fila:
+            return None
+        try:
+            posiciones = _posiciones_cabecera('clientes', next(csv.reader([cabecera]), []))
+        except CabeceraInvalida:
+            # el carregador no llegeix cap fila: no es toca el fitxer
+            return None
+        # la mateixa regla que leer_csv_por_bloques
+        try:
+            _convertir_cliente([fila[i] for i in posiciones])
+        except Exception as e:
+            return e
+        return None
+
+#funcio per copiar a la quarantena de clients una linia que es treu de clientes.csv
+    def _apartar_linea_cliente(self, linea: str, error: Exception) -> None:
+        ruta = os.path.join(self.dir_data, "cuarentena_clientes.csv")
+        nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        with open(ruta, 'a', newline='', encoding='utf-8') as fh:
+            writer = csv.writer(fh)
+            if nuevo:
+                writer.writerow(Cuarentena.CAMPOS)
+            writer.writerow(['', 'linea_incompleta', str(error), linea])
+            fh.flush()
+            os.fsync(fh.fileno())
+
+#funcio per forcar l'fsync de les altes pendents
+    def sincronizar_clientes(self) -> None:
+        if self._fh_journal is not None and self._journal_pendientes:
+            os.fsync(self._fh_journal.fileno())
+        self._journal_pendientes = 0
+
+#funcio per tancar el journal de clients
+    def _cerrar_journal(self) -> None:
+        if self._fh_journal is not None:
+            self.sincronizar_clientes()
+            self._fh_journal.close()
+            self._fh_journal = None
+
+#funcio per compactar clientes.csv: el reescriu sencer i net si hi ha altes al journal
+    def compactar_clientes(self) -> None:
+        if self._journal_lineas:
+            self.guardar_clientes()
+
+#funcio per tancar la BD deixant els fitxers consistents
+    def cerrar(self) -> None:
+        self.compactar_clientes()
+        self._cerrar_journal()
+        self.cerrar_ventas_binario()
 
 #funcio per exportar l'informe on surten els totals per event i ingressos
-    def exportar_informe(self) -> None:
+    @instrumentado
+    def exportar_informe(self, streaming: bool = False) -> None:
+        """Con streaming=True el resumen se calcula leyendo ventas.csv por bloques
+        en lugar de usar las ventas cargadas (sirve para ficheros más grandes que la RAM).
+        """
         ruta = os.path.join(self.dir_data, 'informe_resumen.csv')
+        if streaming:
+            por_evento = resumen_por_evento_csv(self.f_ventas)
+            self._contar(escaneadas=sum(num for num, _ in por_evento.values()))
+        else:
+            por_evento = self._resumen_por_evento()
+            self._contar(escaneadas=len(por_evento))
         # Calculamos un dict: evento_id -> {nombre, num_ventas, total}
         resumen: Dict[int, Dict[str, object]] = {}
-        for v in self.ventas:
-            ev = self.idx_eventos.get(v.evento_id)
-            if not ev:
-                # Aixo es per si hi ha vendes d'esdeveniments que no existeix
-                nombre = f"Evento {v.evento_id} (desconocido)"
-            else:
-                nombre = ev.nombre
-            item = resumen.setdefault(v.evento_id, {'evento_id': v.evento_id, 'evento_nombre': nombre, 'num_ventas': 0, 'total_ingresos': 0.0})
-            item['num_ventas'] = int(item['num_ventas']) + 1
-            item['total_ingresos'] = float(item['total_ingresos']) + float(v.importe)
+        for ev_id, (num, total) in por_evento.items():
+            resumen[ev_id] = {'evento_id': ev_id, 'evento_nombre': self._nombre_evento(ev_id), 'num_ventas': num, 'total_ingresos': total}
 
         with open(ruta, 'w', newline='', encoding='utf-8') as fh:
             campos = ['evento_id', 'evento_nombre', 'num_ventas', 'total_ingresos']
@@ -304,55 +1349,221 @@ class BD:
             writer.writeheader()
             for _, item in sorted(resumen.items()):
                 writer.writerow(item)
+        self._contar(devueltas=len(resumen))
 
         print(f"\n📄 Informe exportado en: {ruta}")
 
 
 
 
+    # ---------------------------
+    # Metriques
+    # ---------------------------
+#funcio per apuntar files escanejades/retornades a l'operacio en curs
+    def _contar(self, escaneadas: int = 0, devueltas: int = 0) -> None:
+        if self.metricas is not None:
+            self.metricas.contar(escaneadas, devueltas)
+
+#funcio per activar la instrumentacio sense reiniciar el programa
+    def activar_metricas(self) -> None:
+        if self.metricas is None:
+            self.metricas = Metricas()
+
+#funcio per mostrar les metriques i guardar-les en json
+    def mostrar_metricas(self) -> None:
+        if self.metricas is None:
+            self.activar_metricas()
+            print("\nMétricas activadas. Se registrarán a partir de ahora.")
+            return
+        self.metricas.mostrar()
+        self.metricas.volcar(self.f_metricas)
+        print(f"\nMétricas guardadas en: {self.f_metricas}")
+
+
+
+    # ---------------------------
+    # Consultes basiques
+    # ---------------------------
+    # Son les operacions que fan servir listar, estadisticas, exportar_informe, etc.
+    # Un altre motor d'emmagatzematge (p.ex. BDSQLite) nomes ha de sobreescriure aquestes.
+    # offset/limite per llistar per pagines (limite=None vol dir fins al final)
+    @staticmethod
+    def _pagina(filas: Sequence, offset: int, limite: Optional[int]) -> Iterator:
+        fin = len(filas) if limite is None else min(len(filas), offset + limite)
+        return (filas[i] for i in range(offset, fin))
+
+    def _todos_clientes(self, offset: int = 0, limite: Optional[int] = None) -> Iterator[Cliente]:
+        return self._pagina(self.clientes, offset, limite)
+
+    def _eventos_por_fecha(self, offset: int = 0, limite: Optional[int] = None) -> Iterator[Evento]:
+        # el calendari ja esta ordenat, no cal ordenar a cada llistat
+        return self._pagina(self.calendario_eventos.eventos, offset, limite)
+
+    def _proximo_evento(self, desde: date) -> Optional[Evento]:
+        return self.calendario_eventos.proximo(desde)
+
+    def _eventos_entre(self, f_ini: date, f_fin: date) -> List[Evento]:
+        return self.calendario_eventos.entre(f_ini, f_fin)
+
+    def _todas_ventas(self, offset: int = 0, limite: Optional[int] = None) -> Iterator[Venta]:
+        return self._pagina(self.ventas, offset, limite)
+
+    def _num_filas(self, tabla: str) -> int:
+        return len({'clientes': self.clientes, 'eventos': self.eventos, 'ventas': self.ventas}[tabla])
+
+    def _ingresos_totales(self) -> float:
+        return self.agg_total
+
+    def _categorias(self) -> Set[str]:
+        return set(self.categorias)
+
+    def _dias_evento_mas_proximo(self) -> Optional[int]:
+        hoy = date.today()
+        e = self._proximo_evento(hoy)
+        return e.dias_hasta_evento(hoy) if e else None
+
+    def _resumen_precios(self) -> Optional[Tuple[float, float, float]]:
+        if not self.eventos:
+            return None
+        precios = [e.precio for e in self.eventos]
+        return (min(precios), max(precios), sum(precios) / len(precios))
+
+
+
     # ---------------------------
     # Operacions diverses
     # ---------------------------
+#funcio per obtenir (num_ventas, total) per cada event dels agregats materialitzats
+    def _resumen_por_evento(self) -> Dict[int, Tuple[int, float]]:
+        return self.agg_por_evento
+
+#funcio per calcular de zero (num_ventas, total) per cada event, en bloc si les ventes son columnars
+    def _calcular_resumen_por_evento(self) -> Dict[int, Tuple[int, float]]:
+        if self.columnar:
+            return self.ventas.ingresos_por_evento()
+        resumen: Dict[int, Tuple[int, float]] = {}
+        for v in self.ventas:
+            num, total = resumen.get(v.evento_id, (0, 0.0))
+            resumen[v.evento_id] = (num + 1, total + v.importe)
+        return resumen
+
+#funcio per obtenir (num_ventas, total) per cada client dels agregats materialitzats
+    def _resumen_por_cliente(self) -> Dict[int, Tuple[int, float]]:
+        return self.agg_por_cliente
+
+#funcio per calcular de zero (num_ventas, total) per cada client
+    def _calcular_resumen_por_cliente(self) -> Dict[int, Tuple[int, float]]:
+        if self.columnar:
+            return self.ventas.ingresos_por_cliente()
+        resumen: Dict[int, Tuple[int, float]] = {}
+        for v in self.ventas:
+            num, total = resumen.get(v.cliente_id, (0, 0.0))
+            resumen[v.cliente_id] = (num + 1, total + v.importe)
+        return resumen
+
+#funcio per calcular (num_ventas, total) per client o event nomes amb les ventes d'un rang de dates
+    def _resumen_rango(self, campo: str, f_ini: date, f_fin: date) -> Dict[int, Tuple[int, float]]:
+        resumen: Dict[int, Tuple[int, float]] = {}
+        for v in self.ventas_en_rango(f_ini, f_fin):
+            clave = getattr(v, campo)
+            num, total = resumen.get(clave, (0, 0.0))
+            resumen[clave] = (num + 1, total + v.importe)
+        return resumen
+
+#funcio per obtenir les ventes d'un client o d'un event amb els index secundaris (ordenades per data)
+    def _ventas_de(self, campo: str, clave: int) -> List[Venta]:
+        if campo not in ('cliente_id', 'evento_id'):
+            raise ValueError(f"Campo no válido: {campo}")
+        indice = self.idx_ventas_cliente if campo == 'cliente_id' else self.idx_ventas_evento
+        ventas = [self.ventas[pos] for pos in indice.get(clave, ())]
+        ventas.sort(key=lambda v: v.fecha_venta)
+        return ventas
+
+#funcio per obtenir les ventes que apunten a un client o un event que no existeix
+    def _ventas_huerfanas(self) -> List[Venta]:
+        posiciones: Set[int] = set()
+        for clave, pos in self.idx_ventas_cliente.items():
+            if clave not in self.idx_clientes:
+                posiciones.update(pos)
+        for clave, pos in self.idx_ventas_evento.items():
+            if clave not in self.idx_eventos:
+                posiciones.update(pos)
+        return [self.ventas[pos] for pos in sorted(posiciones)]
+
+#funcio per obtenir el nom d'un client encara que no existeixi
+    def _nombre_cliente(self, cli_id: int) -> str:
+        c = self.idx_clientes.get(cli_id)
+        return c.nombre if c else f"Cliente {cli_id} (desconocido)"
+
+#funcio per obtenir el nom d'un event encara que no existeixi
+    def _nombre_evento(self, ev_id: int) -> str:
+        ev = self.idx_eventos.get(ev_id)
+        # Aixo es per si hi ha vendes d'esdeveniments que no existeix
+        return ev.nombre if ev else f"Evento {ev_id} (desconocido)"
+
 #funcio per generar un nou id per a les taules
     def generar_nuevo_id(self, tabla: str) -> int:
-        if tabla == 'clientes':
-            existentes = set(self.idx_clientes.keys())
-        elif tabla == 'eventos':
-            existentes = set(self.idx_eventos.keys())
-        elif tabla == 'ventas':
-            existentes = set(self.idx_ventas.keys())
-        else:
+        if tabla not in self._max_id:
             raise ValueError("Tabla desconocida para ID")
-        return (max(existentes) + 1) if existentes else 1
+        return self._max_id[tabla] + 1
 
 
 
 #funcio per fer print de les taules
-    def listar(self, tabla: str) -> None:
-        """Imprime de forma formateada la tabla indicada."""
+    @instrumentado
+    def listar(self, tabla: str, offset: int = 0, limite: Optional[int] = None) -> int:
+        """Imprime de forma formateada la tabla indicada, desde la fila offset y
+        como mucho limite filas (None = hasta el final). La salida se escribe por
+        bloques y la fecha de hoy se calcula una sola vez. Devuelve las filas mostradas.
+        """
         tabla = tabla.lower()
-        if tabla == 'clientes':
-            print("\n=== CLIENTES ===")
-            for c in self.clientes:
-                print(c)
-            print(f"Total: {len(self.clientes)}")
-        elif tabla == 'eventos':
-            print("\n=== EVENTOS ===")
-            for e in sorted(self.eventos, key=lambda x: x.fecha_evento):
-                print(e)
-            print(f"Total: {len(self.eventos)}")
-        elif tabla == 'ventas':
-            print("\n=== VENTAS ===")
-            for v in self.ventas:
-                print(v)
-            print(f"Total: {len(self.ventas)}")
-        else:
+        filas = {
+            'clientes': self._todos_clientes,
+            'eventos': self._eventos_por_fecha,
+            'ventas': self._todas_ventas,
+        }.get(tabla)
+        if filas is None:
             print("Tabla no reconocida. Usa: clientes | eventos | ventas")
+            return 0
+        hoy = date.today()
+        total = self._num_filas(tabla)
+        print(f"\n=== {tabla.upper()} ===")
+        mostradas = 0
+        lineas: List[str] = []
+        for fila in filas(offset, limite):
+            lineas.append(fila.formatear(hoy))
+            if len(lineas) >= TAM_BLOQUE_SALIDA:
+                sys.stdout.write('\n'.join(lineas) + '\n')
+                mostradas += len(lineas)
+                lineas.clear()
+        if lineas:
+            sys.stdout.write('\n'.join(lineas) + '\n')
+            mostradas += len(lineas)
+        if offset or limite is not None:
+            print(f"Filas {offset + 1 if mostradas else offset}-{offset + mostradas} de {total}")
+        else:
+            print(f"Total: {total}")
+        self._contar(mostradas, mostradas)
+        return mostradas
+
+#funcio per llistar una taula pagina a pagina des del menu
+    def listar_interactivo(self, tabla: str) -> None:
+        offset = 0
+        while True:
+            mostradas = self.listar(tabla, offset, TAM_PAGINA)
+            offset += mostradas
+            if mostradas < TAM_PAGINA or offset >= self._num_filas(tabla):
+                break
+            if input("Enter = página siguiente, q = salir: ").strip().lower() == 'q':
+                break
 
 
 #funcio per donar d'alta un nou client
+    @instrumentado
     def alta_cliente(self) -> None:
-        """Pide datos por input(), valida y guarda incrementalmente en CSV."""
+        """Pide datos por input(), valida y guarda incrementalmente en CSV
+        (añadiendo una línea al final si append_clientes está activo).
+        """
         print("\n-- Alta de cliente --")
         nombre = input("Nombre: ").strip()
         email = input("Email: ").strip()
@@ -366,23 +1577,383 @@ class BD:
             print("Formato de fecha incorrecto. Usa YYYY-MM-DD.")
             return
         # Verificar si el email ja existex
-        if any(c.email.lower() == email.lower() for c in self.clientes):
+        if self.existe_email(email):
             print("Ya existe un cliente con ese email.")
             return
 
         nuevo_id = self.generar_nuevo_id('clientes')
         c = Cliente(id=nuevo_id, nombre=nombre, email=email, fecha_alta=fecha)
+        self._insertar_cliente(c)
+        self._contar(devueltas=1)
+
+        if self.append_clientes:
+            self._anotar_cliente(c)
+        else:
+            self.guardar_clientes()
+        print(f"Cliente creado: {c}")
+
+#funcio per saber si un email ja esta donat d'alta (sense distingir majuscules)
+    def existe_email(self, email: str) -> bool:
+        return email.casefold() in self.idx_email
+
+#funcio per afegir un client a memoria mantenint els index
+    def _insertar_cliente(self, c: Cliente) -> None:
         self.clientes.append(c)
         self.idx_clientes[c.id] = c
+        self.idx_email.setdefault(c.email.casefold(), c)
+        self._max_id['clientes'] = max(self._max_id['clientes'], c.id)
+
+#funcio per afegir un bloc de clients a memoria
+    def _insertar_clientes(self, nuevos: List[Cliente]) -> None:
+        for c in nuevos:
+            self._insertar_cliente(c)
+
+#funcio per treure de memoria els ultims clients inserits (si no s'han pogut guardar)
+    def _deshacer_clientes(self, nuevos: List[Cliente]) -> None:
+        del self.clientes[len(self.clientes) - len(nuevos):]
+        for c in nuevos:
+            self.idx_clientes.pop(c.id, None)
+            clave = c.email.casefold()
+            if self.idx_email.get(clave) is c:
+                del self.idx_email[clave]
+        self._max_id['clientes'] = max(self.idx_clientes, default=0)
+
+#funcio per importar molts clients d'un fitxer CSV o JSONL
+    @instrumentado
+    def importar_clientes(self, ruta: str, tam_lote: int = TAM_BLOQUE) -> Tuple[int, Dict[str, int]]:
+        """Importa clientes nuevos desde un CSV (nombre,email,fecha_alta) o un JSONL
+        (un objeto por línea con esas claves). Se valida todo el fichero por lotes,
+        se descartan emails repetidos (contra la tabla y dentro del propio fichero)
+        y solo al final se asignan los ids, se insertan y se guardan de una vez.
+        Si el fichero no se puede leer no se inserta nada; si falla el guardado
+        se deshacen las inserciones.
+        Devuelve (importados, {motivo: num_rechazados}).
+        """
+        rechazados: Dict[str, int] = Counter()
+        vistos: Set[str] = set()
+        validos: List[Tuple[str, str, date]] = []
+        for lote in _leer_lotes_clientes(ruta, tam_lote):
+            for fila in lote:
+                if fila is None:
+                    rechazados['fila_invalida'] += 1
+                    continue
+                nombre, email, fecha_str = fila
+                if not PATRON_EMAIL.match(email):
+                    rechazados['email_invalido'] += 1
+                    continue
+                try:
+                    fecha = parse_fecha(fecha_str)
+                except ValueError:
+                    rechazados['fecha_invalida'] += 1
+                    continue
+                clave = email.casefold()
+                if clave in vistos or self.existe_email(email):
+                    rechazados['email_duplicado'] += 1
+                    continue
+                vistos.add(clave)
+                validos.append((nombre, email, fecha))
+
+        # ids consecutius per tot el fitxer
+        primer_id = self.generar_nuevo_id('clientes')
+        nuevos = [Cliente(primer_id + i, nombre, email, fecha)
+                  for i, (nombre, email, fecha) in enumerate(validos)]
+        self._contar(len(nuevos) + sum(rechazados.values()), len(nuevos))
+        if nuevos:
+            self._insertar_clientes(nuevos)
+            try:
+                if self.append_clientes:
+                    self._anotar_clientes(nuevos)
+                    self.sincronizar_clientes()
+                else:
+                    self.guardar_clientes()
+            except BaseException:
+                self._deshacer_clientes(nuevos)
+                raise
+        return len(nuevos), dict(rechazados)
+
+#funcio per demanar el fitxer a importar per input()
+    def importar_clientes_interactivo(self) -> None:
+        print("\n-- Importar clientes (CSV o JSONL) --")
+        ruta = input("Ruta del fichero: ").strip()
+        try:
+            importados, rechazados = self.importar_clientes(ruta)
+        except (OSError, ValueError) as e:
+            print(f"No se ha podido importar: {e}")
+            return
+        print(f"Clientes importados: {importados}")
+        for motivo, num in sorted(rechazados.items()):
+            print(f"  Rechazados ({motivo}): {num}")
+
+
+#funcio per afegir un event mantenint els index
+    def registrar_evento(self, e: Evento) -> None:
+        e.categoria = sys.intern(e.categoria)
+        anterior = self._categoria_evento(e.id)
+        self.eventos.append(e)
+        self.calendario_eventos.insertar(e)
+        self.idx_eventos[e.id] = e
+        self.categorias.add(e.categoria)
+        self._max_id['eventos'] = max(self._max_id['eventos'], e.id)
+        # les ventes que ja hi havia d'aquest event (p.ex. a 'desconocida') passen a la seva categoria
+        if anterior != e.categoria:
+            for pos in self.idx_ventas_evento.get(e.id, ()):
+                v = self.ventas[pos]
+                self.cubo_ingresos.mover(v.fecha_venta, anterior, e.categoria, v.importe)
+
+#funcio per comprovar que els agregats coincideixen amb recalcular-ho tot (per tests)
+    def comprobar_agregados(self) -> bool:
+        """Recalcula totales, resumen por evento y por cliente, categorías y el cubo de ingresos
+        desde cero y los compara con los agregados mantenidos. Devuelve True si coinciden.
+        """
+        if not (self._resumenes_iguales(self._calcular_resumen_por_evento(), self.agg_por_evento)
+                and self._resumenes_iguales(self._calcular_resumen_por_cliente(), self.agg_por_cliente)):
+            return False
+        for indice, campo in ((self.idx_ventas_cliente, 'cliente_id'), (self.idx_ventas_evento, 'evento_id')):
+            if sum(map(len, indice.values())) != len(self.ventas):
+                return False
+            if any(getattr(self.ventas[pos], campo) != clave
+                   for clave, posiciones in indice.items() for pos in posiciones):
+                return False
+        cubo = CuboIngresos()
+        cubo.reconstruir(self._filas_cubo())
+        for nuevo, actual in ((cubo.por_dia, self.cubo_ingresos.por_dia), (cubo.por_mes, self.cubo_ingresos.por_mes)):
+            if nuevo.keys() != actual.keys():
+                return False
+            if not all(self._resumenes_iguales(nuevo[clave], actual[clave]) for clave in nuevo):
+                return False
+        total = math.fsum(v.importe for v in self.ventas)
+        return (math.isclose(total, self.agg_total, rel_tol=1e-9, abs_tol=1e-6)
+                and self.categorias == {e.categoria for e in self.eventos})
+
+#funcio per comparar dos resums {clau: (num_ventas, total)} amb tolerancia als totals
+    @staticmethod
+    def _resumenes_iguales(a: Dict[int, Tuple[int, float]], b: Dict[int, Tuple[int, float]]) -> bool:
+        if a.keys() != b.keys():
+            return False
+        for clave, (num, total) in a.items():
+            num_b, total_b = b[clave]
+            if num != num_b or not math.isclose(total, total_b, rel_tol=1e-9, abs_tol=1e-6):
+                return False
+        return True
+
+#funcio per afegir una venta mantenint els index
+    def registrar_venta(self, v: Venta) -> None:
+        posicion = len(self.ventas)
+        self.ventas.append(v)
+        if not self.columnar:
+            self.idx_ventas[v.id] = v
+        self._max_id['ventas'] = max(self._max_id['ventas'], v.id)
+        num, total = self.agg_por_evento.get(v.evento_id, (0, 0.0))
+        self.agg_por_evento[v.evento_id] = (num + 1, total + v.importe)
+        num, total = self.agg_por_cliente.get(v.cliente_id, (0, 0.0))
+        self.agg_por_cliente[v.cliente_id] = (num + 1, total + v.importe)
+        self.agg_total += v.importe
+        self.idx_fechas_ventas.insertar(posicion, v.fecha_venta.toordinal())
+        self.cubo_ingresos.agregar(v.fecha_venta, self._categoria_evento(v.evento_id), v.importe)
+        self.idx_ventas_cliente.setdefault(v.cliente_id, array('q')).append(posicion)
+        self.idx_ventas_evento.setdefault(v.evento_id, array('q')).append(posicion)
+        # el binari ja no te totes les ventes
+        self.cerrar_ventas_binario()
+
+#funcio per obtenir les ventes entre dues dates (inclusive) amb l'index ordenat
+    @instrumentado
+    def ventas_en_rango(self, f_ini: date, f_fin: date) -> List[Venta]:
+        if self.ventas_mmap is not None:
+            filtradas = [Venta(i, c, e, date.fromordinal(f), imp)
+                         for i, c, e, f, imp in self.ventas_mmap.filas_rango(f_ini, f_fin)]
+        else:
+            filtradas = [self.ventas[i] for i in self.idx_fechas_ventas.rango(f_ini, f_fin)]
+        # amb l'index nomes es toquen les files del rang
+        self._contar(len(filtradas), len(filtradas))
+        return filtradas
 
-        self.guardar_clientes()
-        print(f"Cliente creado: {c}")
+#funcio per sumar els ingressos entre dues dates (inclusive) amb els acumulats per dia del cub
+    @instrumentado
+    def ingresos_en_rango(self, f_ini: date, f_fin: date) -> float:
+        if self.ventas_mmap is not None:
+            return self.ventas_mmap.ingresos(f_ini, f_fin)
+        return self.cubo_ingresos.ventana(f_ini, f_fin)[1]
+
+#funcio per obtenir (num_ventas, total) d'una finestra de dates i, si es vol, d'una categoria
+    def ventana_ingresos(self, f_ini: date, f_fin: date, categoria: Optional[str] = None) -> Tuple[int, float]:
+        return self.cubo_ingresos.ventana(f_ini, f_fin, categoria)
+
+#funcio per obtenir la tendencia mensual: [(any, mes, categoria, num_ventas, total)]
+    def tendencia_mensual(self) -> List[Tuple[int, int, str, int, float]]:
+        filas = [(anyo, mes, 'TOTAL', num, total) for anyo, mes, num, total in self.cubo_ingresos.mensual()]
+        for categoria in self.cubo_ingresos.categorias():
+            filas.extend((anyo, mes, categoria, num, total)
+                         for anyo, mes, num, total in self.cubo_ingresos.mensual(categoria))
+        return sorted(filas, key=lambda f: (f[0], f[1], f[2] != 'TOTAL', f[2]))
+
+#funcio per mostrar i exportar la tendencia mensual d'ingressos
+    @instrumentado
+    def exportar_tendencia(self) -> None:
+        filas = self.tendencia_mensual()
+        print("\n=== TENDENCIA MENSUAL ===")
+        for anyo, mes, categoria, num, total in filas:
+            if categoria == 'TOTAL':
+                print(f"{anyo}-{mes:02d}: {total:.2f}€ ({num} ventas)")
+            else:
+                print(f"    {categoria}: {total:.2f}€ ({num} ventas)")
+        ruta = os.path.join(self.dir_data, 'tendencia_mensual.csv')
+        with open(ruta, 'w', newline='', encoding='utf-8') as fh:
+            writer = csv.writer(fh)
+            writer.writerow(['mes', 'categoria', 'num_ventas', 'total_ingresos'])
+            for anyo, mes, categoria, num, total in filas:
+                writer.writerow([f"{anyo}-{mes:02d}", categoria, num, total])
+        self._contar(len(filas), len(filas))
+        print(f"\n📄 Tendencia exportada en: {ruta}")
+
+#funcio per escriure les ventes carregades al binari d'amplada fixa (ordenades per data)
+    def exportar_ventas_binario(self, ruta: Optional[str] = None) -> str:
+        ruta = ruta or self.f_ventas_bin
+        posiciones = self.idx_fechas_ventas.posiciones
+        registros = (
+            (v.id, v.cliente_id, v.evento_id, v.fecha_venta.toordinal(), v.importe)
+            for v in (self.ventas[i] for i in posiciones)
+        )
+        VentasMmap.escribir(ruta, registros, len(posiciones))
+        return ruta
+
+#funcio per obrir el binari de ventes amb mmap (no cal haver carregat el csv)
+    def abrir_ventas_binario(self, ruta: Optional[str] = None) -> None:
+        self.cerrar_ventas_binario()
+        self.ventas_mmap = VentasMmap(ruta or self.f_ventas_bin)
+
+#funcio per tancar el binari de ventes (les consultes tornen a anar a memoria)
+    def cerrar_ventas_binario(self) -> None:
+        if self.ventas_mmap is not None:
+            self.ventas_mmap.cerrar()
+            self.ventas_mmap = None
+
+
+#funcio per obtenir el proxim event (avui inclos) amb el calendari
+    def proximo_evento(self) -> Optional[Evento]:
+        return self._proximo_evento(date.today())
+
+#funcio per obtenir els events dels propers dies (avui inclos), ordenats per data
+    @instrumentado
+    def eventos_proximos(self, dias: int = DIAS_PROXIMOS) -> List[Evento]:
+        hoy = date.today()
+        eventos = self._eventos_entre(hoy, hoy + timedelta(days=dias))
+        self._contar(len(eventos), len(eventos))
+        return eventos
+
+#funcio per obtenir l'historial de compres d'un client (ordenat per data)
+    @instrumentado
+    def historial_cliente(self, cli_id: int) -> List[Venta]:
+        ventas = self._ventas_de('cliente_id', cli_id)
+        # amb l'index nomes es toquen les ventes del client
+        self._contar(len(ventas), len(ventas))
+        return ventas
+
+#funcio per obtenir el valor d'un client: (num_compres, total gastat), ja esta als agregats
+    def valor_cliente(self, cli_id: int) -> Tuple[int, float]:
+        return self.agg_por_cliente.get(cli_id, (0, 0.0))
+
+#funcio per obtenir els assistents d'un event: [(cliente_id, nombre, num_entradas)] per id de client
+    @instrumentado
+    def asistentes_evento(self, ev_id: int) -> List[Tuple[int, str, int]]:
+        ventas = self._ventas_de('evento_id', ev_id)
+        entradas = Counter(v.cliente_id for v in ventas)
+        self._contar(len(ventas), len(entradas))
+        return [(cli_id, self._nombre_cliente(cli_id), num) for cli_id, num in sorted(entradas.items())]
+
+#funcio per obtenir les ventes orfes (client o event inexistent)
+    @instrumentado
+    def ventas_huerfanas(self) -> List[Venta]:
+        huerfanas = self._ventas_huerfanas()
+        self._contar(len(huerfanas), len(huerfanas))
+        return huerfanas
+
+#funcio per demanar per input() un client o un event i mostrar-ne la fitxa
+    def ficha_interactiva(self) -> None:
+        print("\n-- Ficha de cliente / evento --")
+        tabla = input("¿De qué tabla? (clientes/eventos): ").strip().lower()
+        if tabla not in ('clientes', 'eventos'):
+            print("Tabla no reconocida. Usa: clientes | eventos")
+            return
+        try:
+            clave = int(input("Id: ").strip())
+        except ValueError:
+            print("El id debe ser un número.")
+            return
+
+        if tabla == 'clientes':
+            ventas = self.historial_cliente(clave)
+            print(f"\nHistorial de {self._nombre_cliente(clave)}:")
+            for v in ventas:
+                print(f"  {v.fecha_venta.isoformat()} - {self._nombre_evento(v.evento_id)}: {v.importe:.2f}€")
+            print(f"Total: {math.fsum(v.importe for v in ventas):.2f}€ ({len(ventas)} compras)")
+        else:
+            asistentes = self.asistentes_evento(clave)
+            print(f"\nAsistentes de {self._nombre_evento(clave)}:")
+            for cli_id, nombre, num in asistentes:
+                print(f"  {cli_id} - {nombre}: {num} entradas")
+            print(f"Total asistentes: {len(asistentes)}")
+
+
+#funcio per obtenir els K clients o events que mes han facturat (amb finestra de dates opcional)
+    @instrumentado
+    def top_ingresos(self, tabla: str, k: int = 10, f_ini: Optional[date] = None,
+                     f_fin: Optional[date] = None) -> List[Tuple[int, str, int, float]]:
+        """Devuelve [(id, nombre, num_ventas, total), ...] de mayor a menor total.
+        Sin fechas usa los agregados mantenidos; con fechas agrega solo las ventas
+        del rango. La selección es parcial con un heap (O(n log k)), sin ordenar todo.
+        """
+        if tabla not in ('clientes', 'eventos'):
+            raise ValueError("Tabla no reconocida. Usa: clientes | eventos")
+        campo = 'cliente_id' if tabla == 'clientes' else 'evento_id'
+        if f_ini is None and f_fin is None:
+            resumen = self._resumen_por_cliente() if tabla == 'clientes' else self._resumen_por_evento()
+        else:
+            resumen = self._resumen_rango(campo, f_ini or date.min, f_fin or date.max)
+        mejores = heapq.nlargest(k, resumen.items(), key=lambda x: x[1][1])
+        nombre = self._nombre_cliente if tabla == 'clientes' else self._nombre_evento
+        self._contar(len(resumen), len(mejores))
+        return [(clave, nombre(clave), num, total) for clave, (num, total) in mejores]
+
+#funcio per demanar per input() el top K, mostrar-lo i exportar-lo a csv
+    def top_ingresos_interactivo(self) -> None:
+        print("\n-- Top por ingresos --")
+        tabla = input("¿De qué tabla? (clientes/eventos): ").strip().lower()
+        if tabla not in ('clientes', 'eventos'):
+            print("Tabla no reconocida. Usa: clientes | eventos")
+            return
+        try:
+            k = int(input("¿Cuántos? (K): ").strip() or 10)
+            ini_str = input("Fecha inicio (YYYY-MM-DD, vacío = sin límite): ").strip()
+            fin_str = input("Fecha fin (YYYY-MM-DD, vacío = sin límite): ").strip()
+            f_ini = parse_fecha(ini_str) if ini_str else None
+            f_fin = parse_fecha(fin_str) if fin_str else None
+        except ValueError:
+            print("Valor no válido. K debe ser un número y las fechas YYYY-MM-DD.")
+            return
+        if k <= 0:
+            print("K debe ser mayor que 0.")
+            return
+
+        top = self.top_ingresos(tabla, k, f_ini, f_fin)
+        print(f"\nTop {k} {tabla} por ingresos:")
+        for pos, (clave, nombre, num, total) in enumerate(top, start=1):
+            print(f"  {pos}. {clave} - {nombre}: {total:.2f}€ ({num} ventas)")
+
+        ruta = os.path.join(self.dir_data, f'top_{tabla}.csv')
+        with open(ruta, 'w', newline='', encoding='utf-8') as fh:
+            writer = csv.writer(fh)
+            writer.writerow(['posicion', 'id', 'nombre', 'num_ventas', 'total_ingresos'])
+            for pos, fila in enumerate(top, start=1):
+                writer.writerow([pos, *fila])
+        print(f"\n📄 Top exportado en: {ruta}")
 
 
 #funcio per filtrar les ventes per rang de dates
-    def filtrar_ventas_por_rango(self) -> List[Venta]:
+    @instrumentado
+    def filtrar_ventas_por_rango(self) -> List[Union[Venta, Tuple[int, int, int, int, float]]]:
         """Solicita dos fechas al usuario, valida e imprime las ventas en el rango (inclusive).
-        Devuelve la lista filtrada por si se quiere reutilizar.
+        Devuelve la lista filtrada por si se quiere reutilizar. Con ventas.bin abierto son las
+        tuplas (id, cliente_id, evento_id, fecha ordinal, importe) del mmap, sin crear ninguna Venta.
         """
         print("\n-- Filtro de ventas por rango de fechas --")
         ini_str = input("Fecha inicio (YYYY-MM-DD): ").strip()
@@ -397,18 +1968,25 @@ class BD:
             print("La fecha de inicio no puede ser posterior a la fecha fin.")
             return []
 
-        filtradas = [v for v in self.ventas if f_ini <= v.fecha_venta <= f_fin]
-
         print(f"\nVentas entre {f_ini.isoformat()} y {f_fin.isoformat()} (ambas inclusive):")
-        total = 0.0
-        for v in filtradas:
-            print(v)
-            total += v.importe
+        if self.ventas_mmap is not None:
+            # amb el binari obert es formata i se suma directament des de les tuples del mmap
+            filtradas = list(self.ventas_mmap.filas_rango(f_ini, f_fin))
+            self._contar(len(filtradas), len(filtradas))
+            for i, c, e, f, imp in filtradas:
+                print(Venta.formatear_fila(i, c, e, date.fromordinal(f), imp))
+            total = math.fsum(fila[4] for fila in filtradas)
+        else:
+            filtradas = self.ventas_en_rango(f_ini, f_fin)
+            for v in filtradas:
+                print(v)
+            total = self.ingresos_en_rango(f_ini, f_fin)
         print(f"Total ventas encontradas: {len(filtradas)} — Ingresos: {total:.2f}€")
         return filtradas
 
 
 #funcio per mostrar les estadistiques
+    @instrumentado
     def estadisticas(self) -> None:
         """Muestra métricas generales solicitadas:
         - Ingresos totales
@@ -419,41 +1997,354 @@ class BD:
         """
         print("\n=== ESTADÍSTICAS ===")
 
-        # Ingressos totals , sumem l'import de totes les ventes
-        ingresos_totales = sum(v.importe for v in self.ventas)
+        # Ingressos totals , ja estan sumats als agregats
+        ingresos_totales = self._ingresos_totales()
         print(f"Ingresos totales: {ingresos_totales:.2f}€")
 
         # Ingressos per event , sumem l'import per cada event
-        ingresos_por_evento: Dict[int, float] = {}
-        for v in self.ventas:
-            ingresos_por_evento[v.evento_id] = ingresos_por_evento.get(v.evento_id, 0.0) + v.importe
+        ingresos_por_evento: Dict[int, float] = {ev_id: total for ev_id, (_, total) in self._resumen_por_evento().items()}
         print("Ingresos por evento (evento_id -> total €):")
         for ev_id, total in sorted(ingresos_por_evento.items()):
-            nombre = self.idx_eventos.get(ev_id).nombre if ev_id in self.idx_eventos else f"Evento {ev_id} (desconocido)"
-            print(f"  {ev_id} - {nombre}: {total:.2f}€")
+            print(f"  {ev_id} - {self._nombre_evento(ev_id)}: {total:.2f}€")
+        self._contar(len(ingresos_por_evento), len(ingresos_por_evento))
 
         # Fem print del set de categories
-        categorias: Set[str] = {e.categoria for e in self.eventos}
+        categorias: Set[str] = self._categorias()
         print(f"Categorías: {categorias}")
 
         # dies fins l'event mes proper
-        futuros = [e for e in self.eventos if e.fecha_evento >= date.today()]
-        if futuros:
-            dias_min = min(e.dias_hasta_evento() for e in futuros)
+        dias_min = self._dias_evento_mas_proximo()
+        if dias_min is not None:
             print(f"Días hasta el evento más próximo: {dias_min}")
         else:
             print("Días hasta el evento más próximo: n/d (no hay eventos futuros)")
+        # events dels propers dies, directament del calendari
+        proximos = self.eventos_proximos(DIAS_PROXIMOS)
+        print(f"Eventos en los próximos {DIAS_PROXIMOS} días: {len(proximos)}")
+        for e in proximos:
+            print(f"  {e.fecha_evento.isoformat()} - {e.nombre}")
 
         # Indiquem min, max, mitja de preus dels events
-        if self.eventos:
-            precios = [e.precio for e in self.eventos]
-            min_p, max_p = min(precios), max(precios)
-            media_p = sum(precios) / len(precios)
-            resumen_precios: Tuple[float, float, float] = (min_p, max_p, media_p)
+        resumen_precios = self._resumen_precios()
+        if resumen_precios is not None:
             print(f"Precios de eventos (min, max, media): {resumen_precios}")
         else:
             print("Precios de eventos (min, max, media): n/d")
 
+        # ventes que apunten a clients o events que no existeixen
+        huerfanas = self.ventas_huerfanas()
+        if huerfanas:
+            print(f"Ventas huérfanas (cliente o evento inexistente): {len(huerfanas)} — ids: {[v.id for v in huerfanas[:20]]}")
+
+
+# ------------------------------------
+# Motor SQLite
+# ------------------------------------
+
+class BDSQLite(BD):
+    """Misma interfaz que BD pero las tablas viven en una base de datos sqlite3
+    (data/bd.sqlite3) con índices por fecha_venta, evento_id, cliente_id y email.
+    Los CSV siguen siendo el origen de los datos: cargar_datos solo los vuelve a
+    importar si han cambiado desde la última importación, y las altas se escriben
+    en la base de datos y también en clientes.csv.
+    Las consultas se resuelven en SQL, sin tener las tablas en objetos Python.
+    """
+
+    ESQUEMA_SQL = """
+        CREATE TABLE IF NOT EXISTS clientes (
+            id INTEGER PRIMARY KEY, nombre TEXT NOT NULL, email TEXT NOT NULL,
+            email_norm TEXT NOT NULL, fecha_alta TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS eventos (
+            id INTEGER PRIMARY KEY, nombre TEXT NOT NULL, fecha_evento TEXT NOT NULL,
+            categoria TEXT NOT NULL, precio REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS ventas (
+            id INTEGER PRIMARY KEY, cliente_id INTEGER NOT NULL, evento_id INTEGER NOT NULL,
+            fecha_venta TEXT NOT NULL, importe REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS ix_clientes_email ON clientes(email_norm);
+        CREATE INDEX IF NOT EXISTS ix_eventos_fecha ON eventos(fecha_evento);
+        CREATE INDEX IF NOT EXISTS ix_ventas_fecha ON ventas(fecha_venta);
+        CREATE INDEX IF NOT EXISTS ix_ventas_evento ON ventas(evento_id);
+        CREATE INDEX IF NOT EXISTS ix_ventas_cliente ON ventas(cliente_id);
+    """
+
+    def __init__(self, append_clientes: bool = True, ruta_db: Optional[str] = None, instrumentar: bool = False):
+        super().__init__(columnar=False, append_clientes=append_clientes, instrumentar=instrumentar)
+        self.f_sqlite = ruta_db or os.path.join(self.dir_data, "bd.sqlite3")
+        self.con = sqlite3.connect(self.f_sqlite)
+        self.con.executescript(self.ESQUEMA_SQL)
+
+    # ---------------------------
+    # Carrega (importacio dels csv)
+    # ---------------------------
+    @instrumentado
+    def cargar_datos(self, progreso: Optional[Callable[[str, int], None]] = None,
+                     paralelo: bool = False, procesos: Optional[int] = None,
+                     snapshot: bool = False) -> None:
+        """Importa los 3 CSV a la base de datos si han cambiado desde la última vez.
+        El parámetro snapshot no se usa: la propia base de datos ya es persistente.
+        """
+        self._paralelo = paralelo
+        self._procesos = procesos
+        self._cerrar_journal()
+        self.cerrar_ventas_binario()
+        if self._clave_guardada() == repr(self._clave_snapshot()):
+            print("\nCarga completada (sqlite, sin cambios en los CSV).")
+            return
+        with self.con:
+            for tabla in ('ventas', 'eventos', 'clientes'):
+                self.con.execute(f"DELETE FROM {tabla}")
+            self._importar(self.f_clientes, 'clientes', progreso,
+                           "INSERT OR REPLACE INTO clientes VALUES (?, ?, ?, ?, ?)",
+                           lambda f: (f[0], f[1], f[2], f[2].casefold(), f[3].isoformat()))
+            self._importar(self.f_eventos, 'eventos', progreso,
+                           "INSERT OR REPLACE INTO eventos VALUES (?, ?, ?, ?, ?)",
+                           lambda f: (f[0], f[1], f[2].isoformat(), f[3], f[4]))
+            self._importar(self.f_ventas, 'ventas', progreso,
+                           "INSERT OR REPLACE INTO ventas VALUES (?, ?, ?, ?, ?)",
+                           lambda f: (f[0], f[1], f[2], f[3].isoformat(), f[4]))
+            self._guardar_clave()
+        print("\nCarga completada (sqlite).")
+
+#funcio per importar un csv a la seva taula per blocs
+    def _importar(self, ruta: str, tabla: str, progreso, sql: str, a_fila: Callable[[tuple], tuple]) -> None:
+        try:
+            for bloque in self._bloques(ruta, tabla, progreso):
+                self._contar(len(bloque), len(bloque))
+                self.con.executemany(sql, map(a_fila, bloque))
+        except FileNotFoundError:
+            print(f"[{tabla}.csv] No encontrado. La tabla de {tabla} se inicializa vacía.")
+        except CabeceraInvalida as e:
+            print(f"{e}. La tabla de {tabla} se inicializa vacía.")
+
+    def _clave_guardada(self) -> Optional[str]:
+        fila = self.con.execute("SELECT valor FROM meta WHERE clave = 'csv'").fetchone()
+        return fila[0] if fila else None
+
+#funcio per apuntar que la base de dades correspon als csv actuals
+    def _guardar_clave(self) -> None:
+        self.con.execute("INSERT OR REPLACE INTO meta VALUES ('csv', ?)", (repr(self._clave_snapshot()),))
+
+    # les altes tambe s'escriuen al csv; despres la bd segueix al dia amb el csv
+    def _anotar_clientes(self, nuevos: List[Cliente]) -> None:
+        super()._anotar_clientes(nuevos)
+        with self.con:
+            self._guardar_clave()
+
+    def guardar_clientes(self) -> None:
+        super().guardar_clientes()
+        with self.con:
+            self._guardar_clave()
+
+    def cerrar(self) -> None:
+        super().cerrar()
+        self.con.close()
+
+    # ---------------------------
+    # Conversio de files sql
+    # ---------------------------
+    @staticmethod
+    def _cliente(f: tuple) -> Cliente:
+        return Cliente(f[0], f[1], f[2], parse_fecha(f[3]))
+
+    @staticmethod
+    def _evento(f: tuple) -> Evento:
+        return Evento(f[0], f[1], parse_fecha(f[2]), sys.intern(f[3]), f[4])
+
+    @staticmethod
+    def _venta(f: tuple) -> Venta:
+        return Venta(f[0], f[1], f[2], parse_fecha(f[3]), f[4])
+
+    # ---------------------------
+    # Consultes basiques (en SQL)
+    # ---------------------------
+    # LIMIT -1 a sqlite vol dir sense limit
+    def _todos_clientes(self, offset: int = 0, limite: Optional[int] = None) -> Iterator[Cliente]:
+        return map(self._cliente, self.con.execute(
+            "SELECT id, nombre, email, fecha_alta FROM clientes ORDER BY id LIMIT ? OFFSET ?",
+            (-1 if limite is None else limite, offset)))
+
+    def _eventos_por_fecha(self, offset: int = 0, limite: Optional[int] = None) -> Iterator[Evento]:
+        return map(self._evento, self.con.execute(
+            "SELECT id, nombre, fecha_evento, categoria, precio FROM eventos ORDER BY fecha_evento LIMIT ? OFFSET ?",
+            (-1 if limite is None else limite, offset)))
+
+    def _todas_ventas(self, offset: int = 0, limite: Optional[int] = None) -> Iterator[Venta]:
+        return map(self._venta, self.con.execute(
+            "SELECT id, cliente_id, evento_id, fecha_venta, importe FROM ventas ORDER BY id LIMIT ? OFFSET ?",
+            (-1 if limite is None else limite, offset)))
+
+    def _num_filas(self, tabla: str) -> int:
+        if tabla not in ('clientes', 'eventos', 'ventas'):
+            raise ValueError("Tabla desconocida")
+        return self.con.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+
+    def _ingresos_totales(self) -> float:
+        return self.con.execute("SELECT COALESCE(SUM(importe), 0.0) FROM ventas").fetchone()[0]
+
+    def _categorias(self) -> Set[str]:
+        return {f[0] for f in self.con.execute("SELECT DISTINCT categoria FROM eventos")}
+
+    def _proximo_evento(self, desde: date) -> Optional[Evento]:
+        fila = self.con.execute(
+            "SELECT id, nombre, fecha_evento, categoria, precio FROM eventos WHERE fecha_evento >= ? "
+            "ORDER BY fecha_evento LIMIT 1", (desde.isoformat(),)).fetchone()
+        return self._evento(fila) if fila else None
+
+    def _eventos_entre(self, f_ini: date, f_fin: date) -> List[Evento]:
+        return [self._evento(f) for f in self.con.execute(
+            "SELECT id, nombre, fecha_evento, categoria, precio FROM eventos WHERE fecha_evento BETWEEN ? AND ? "
+            "ORDER BY fecha_evento", (f_ini.isoformat(), f_fin.isoformat()))]
+
+    def _resumen_precios(self) -> Optional[Tuple[float, float, float]]:
+        fila = self.con.execute("SELECT MIN(precio), MAX(precio), AVG(precio) FROM eventos").fetchone()
+        return None if fila[0] is None else tuple(fila)
+
+    def _resumen_por_evento(self) -> Dict[int, Tuple[int, float]]:
+        return {ev_id: (num, total) for ev_id, num, total in self.con.execute(
+            "SELECT evento_id, COUNT(*), SUM(importe) FROM ventas GROUP BY evento_id")}
+
+    def _resumen_por_cliente(self) -> Dict[int, Tuple[int, float]]:
+        return {cli_id: (num, total) for cli_id, num, total in self.con.execute(
+            "SELECT cliente_id, COUNT(*), SUM(importe) FROM ventas GROUP BY cliente_id")}
+
+    def _resumen_rango(self, campo: str, f_ini: date, f_fin: date) -> Dict[int, Tuple[int, float]]:
+        if campo not in ('cliente_id', 'evento_id'):
+            raise ValueError(f"Campo no válido: {campo}")
+        return {clave: (num, total) for clave, num, total in self.con.execute(
+            f"SELECT {campo}, COUNT(*), SUM(importe) FROM ventas WHERE fecha_venta BETWEEN ? AND ? GROUP BY {campo}",
+            (f_ini.isoformat(), f_fin.isoformat()))}
+
+    def _ventas_de(self, campo: str, clave: int) -> List[Venta]:
+        if campo not in ('cliente_id', 'evento_id'):
+            raise ValueError(f"Campo no válido: {campo}")
+        return [self._venta(f) for f in self.con.execute(
+            f"SELECT id, cliente_id, evento_id, fecha_venta, importe FROM ventas WHERE {campo} = ? "
+            "ORDER BY fecha_venta", (clave,))]
+
+    def _ventas_huerfanas(self) -> List[Venta]:
+        return [self._venta(f) for f in self.con.execute(
+            "SELECT v.id, v.cliente_id, v.evento_id, v.fecha_venta, v.importe FROM ventas v "
+            "LEFT JOIN clientes c ON c.id = v.cliente_id LEFT JOIN eventos e ON e.id = v.evento_id "
+            "WHERE c.id IS NULL OR e.id IS NULL ORDER BY v.id")]
+
+    def valor_cliente(self, cli_id: int) -> Tuple[int, float]:
+        return tuple(self.con.execute("SELECT COUNT(*), COALESCE(SUM(importe), 0.0) FROM ventas WHERE cliente_id = ?",
+                                      (cli_id,)).fetchone())
+
+    def _nombre_cliente(self, cli_id: int) -> str:
+        fila = self.con.execute("SELECT nombre FROM clientes WHERE id = ?", (cli_id,)).fetchone()
+        return fila[0] if fila else f"Cliente {cli_id} (desconocido)"
+
+    def _nombre_evento(self, ev_id: int) -> str:
+        fila = self.con.execute("SELECT nombre FROM eventos WHERE id = ?", (ev_id,)).fetchone()
+        return fila[0] if fila else f"Evento {ev_id} (desconocido)"
+
+    def generar_nuevo_id(self, tabla: str) -> int:
+        if tabla not in self._max_id:
+            raise ValueError("Tabla desconocida para ID")
+        return self.con.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {tabla}").fetchone()[0]
+
+    def existe_email(self, email: str) -> bool:
+        return self.con.execute("SELECT 1 FROM clientes WHERE email_norm = ? LIMIT 1",
+                                (email.casefold(),)).fetchone() is not None
+
+    def _insertar_cliente(self, c: Cliente) -> None:
+        self._insertar_clientes([c])
+
+    def _insertar_clientes(self, nuevos: List[Cliente]) -> None:
+        with self.con:
+            self.con.executemany("INSERT OR REPLACE INTO clientes VALUES (?, ?, ?, ?, ?)",
+                                 [(c.id, c.nombre, c.email, c.email.casefold(), c.fecha_alta.isoformat())
+                                  for c in nuevos])
+
+    def _deshacer_clientes(self, nuevos: List[Cliente]) -> None:
+        with self.con:
+            self.con.executemany("DELETE FROM clientes WHERE id = ?", [(c.id,) for c in nuevos])
+
+    def registrar_evento(self, e: Evento) -> None:
+        with self.con:
+            self.con.execute("INSERT OR REPLACE INTO eventos VALUES (?, ?, ?, ?, ?)",
+                             (e.id, e.nombre, e.fecha_evento.isoformat(), e.categoria, e.precio))
+
+    def registrar_venta(self, v: Venta) -> None:
+        with self.con:
+            self.con.execute("INSERT OR REPLACE INTO ventas VALUES (?, ?, ?, ?, ?)",
+                             (v.id, v.cliente_id, v.evento_id, v.fecha_venta.isoformat(), v.importe))
+        self.cerrar_ventas_binario()
+
+    # aqui no hi ha agregats mantinguts: es comprova que les consultes agregades quadren amb les files
+    def comprobar_agregados(self) -> bool:
+        por_evento: Dict[int, Tuple[int, float]] = {}
+        por_cliente: Dict[int, Tuple[int, float]] = {}
+        for v in self._todas_ventas():
+            num, total = por_evento.get(v.evento_id, (0, 0.0))
+            por_evento[v.evento_id] = (num + 1, total + v.importe)
+            num, total = por_cliente.get(v.cliente_id, (0, 0.0))
+            por_cliente[v.cliente_id] = (num + 1, total + v.importe)
+        total = math.fsum(total for _, total in por_evento.values())
+        return (self._resumenes_iguales(por_evento, self._resumen_por_evento())
+                and self._resumenes_iguales(por_cliente, self._resumen_por_cliente())
+                and math.isclose(total, self._ingresos_totales(), rel_tol=1e-9, abs_tol=1e-6)
+                and self._categorias() == {e.categoria for e in self._eventos_por_fecha()})
+
+    # el binari es fa directament de la taula de ventes, ordenada per data
+    def exportar_ventas_binario(self, ruta: Optional[str] = None) -> str:
+        ruta = ruta or self.f_ventas_bin
+        num = self._num_filas('ventas')
+        registros = (
+            (i, c, e, parse_fecha(f).toordinal(), imp)
+            for i, c, e, f, imp in self.con.execute(
+                "SELECT id, cliente_id, evento_id, fecha_venta, importe FROM ventas ORDER BY fecha_venta, id")
+        )
+        VentasMmap.escribir(ruta, registros, num)
+        return ruta
+
+    @instrumentado
+    def ventas_en_rango(self, f_ini: date, f_fin: date) -> List[Venta]:
+        filtradas = [self._venta(f) for f in self.con.execute(
+            "SELECT id, cliente_id, evento_id, fecha_venta, importe FROM ventas "
+            "WHERE fecha_venta BETWEEN ? AND ? ORDER BY fecha_venta", (f_ini.isoformat(), f_fin.isoformat()))]
+        self._contar(len(filtradas), len(filtradas))
+        return filtradas
+
+    @instrumentado
+    def ingresos_en_rango(self, f_ini: date, f_fin: date) -> float:
+        return self.con.execute("SELECT COALESCE(SUM(importe), 0.0) FROM ventas WHERE fecha_venta BETWEEN ? AND ?",
+                                (f_ini.isoformat(), f_fin.isoformat())).fetchone()[0]
+
+    def ventana_ingresos(self, f_ini: date, f_fin: date, categoria: Optional[str] = None) -> Tuple[int, float]:
+        sql = ("SELECT COUNT(*), COALESCE(SUM(v.importe), 0.0) FROM ventas v "
+               "LEFT JOIN eventos e ON e.id = v.evento_id WHERE v.fecha_venta BETWEEN ? AND ?")
+        params: List[object] = [f_ini.isoformat(), f_fin.isoformat()]
+        if categoria is not None:
+            sql += " AND COALESCE(e.categoria, 'desconocida') = ?"
+            params.append(categoria)
+        return tuple(self.con.execute(sql, params).fetchone())
+
+    def tendencia_mensual(self) -> List[Tuple[int, int, str, int, float]]:
+        filas = self.con.execute(
+            "SELECT substr(v.fecha_venta, 1, 7) AS mes, COALESCE(e.categoria, 'desconocida'), COUNT(*), SUM(v.importe) "
+            "FROM ventas v LEFT JOIN eventos e ON e.id = v.evento_id GROUP BY mes, 2").fetchall()
+        totales: Dict[str, List[float]] = {}
+        resultado: List[Tuple[int, int, str, int, float]] = []
+        for mes, categoria, num, total in filas:
+            anyo, m = int(mes[:4]), int(mes[5:7])
+            resultado.append((anyo, m, categoria, num, total))
+            celda = totales.setdefault(mes, [0, 0.0])
+            celda[0] += num
+            celda[1] += total
+        resultado.extend((int(mes[:4]), int(mes[5:7]), 'TOTAL', num, total) for mes, (num, total) in totales.items())
+        return sorted(resultado, key=lambda f: (f[0], f[1], f[2] != 'TOTAL', f[2]))
+
+
+
+
+
+
+
+
+
 
 # ---------------------------
 # Menu
@@ -471,13 +2362,18 @@ def mostrar_menu() -> None:
 4) Filtro de ventas por rango de fechas
 5) Estadísticas
 6) Exportar informe (totales por evento)
-7) Salir
+7) Importar clientes (CSV | JSONL)
+8) Métricas de rendimiento
+9) Top clientes / eventos por ingresos
+10) Tendencia mensual de ingresos
+11) Ficha de cliente / evento (historial, asistentes)
+12) Salir
 """
     )
 
 #funcio per demanar l'opcio
 def pedir_opcion() -> str:
-    return input("Elige una opción (1-7): ").strip()
+    return input("Elige una opción (1-12): ").strip()
 
 #funcio per demanar quina taula listar
 def input_listar() -> str:
@@ -489,19 +2385,35 @@ def input_listar() -> str:
 # ---------------------------
 # Función principal (bucle app)
 # ---------------------------
+#funcio per crear la BD amb el motor configurat a MOTOR
+def crear_bd() -> BD:
+    if MOTOR == 'sqlite':
+        return BDSQLite(instrumentar=INSTRUMENTAR)
+    if MOTOR == 'memoria':
+        return BD(instrumentar=INSTRUMENTAR)
+    raise ValueError(f"Motor desconocido: {MOTOR}")
+
+
+#funcio per carregar les dades segons la configuracio (i, si cal, escriure i obrir ventas.bin)
+def cargar(bd: BD) -> None:
+    bd.cargar_datos(paralelo=CARGA_PARALELA, snapshot=USAR_SNAPSHOT)
+    if USAR_VENTAS_BIN:
+        bd.abrir_ventas_binario(bd.exportar_ventas_binario())
+
+
 #MAIN
 def main():
-    bd = BD()
-    bd.cargar_datos()
+    bd = crear_bd()
+    cargar(bd)
 
     while True:
         mostrar_menu()
         op = pedir_opcion()
 
         if op == '1':
-            bd.cargar_datos()
+            cargar(bd)
         elif op == '2':
-            bd.listar(input_listar())
+            bd.listar_interactivo(input_listar())
         elif op == '3':
             bd.alta_cliente()
         elif op == '4':
@@ -511,6 +2423,17 @@ def main():
         elif op == '6':
             bd.exportar_informe()
         elif op == '7':
+            bd.importar_clientes_interactivo()
+        elif op == '8':
+            bd.mostrar_metricas()
+        elif op == '9':
+            bd.top_ingresos_interactivo()
+        elif op == '10':
+            bd.exportar_tendencia()
+        elif op == '11':
+            bd.ficha_interactiva()
+        elif op == '12':
+            bd.cerrar()
             print("\nCerrando programa")
             break
         else:
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de la Práctica final.
+Genera datos sintéticos y mide cuánto tarda la BD en procesarlos.
+
+Uso:
+    python benchmark.py generar DIR [--clientes N] [--eventos N] [--ventas N] [--semilla S]
+    python benchmark.py suite [--clientes N] [--eventos N] [--ventas N] [--motor M] [--salida F]
+    python benchmark.py fechas [--filas N]
+    python benchmark.py memoria [--filas N]
+
+La suite escribe un JSON con el tiempo, el rendimiento (filas/s) y el pico de
+memoria de cada operación, para poder comparar entre versiones.
+"""
+
+from __future__ import annotations
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List
+
+import Practica_final as pf
+
+
+
+
+
+# ---------------------------
+# Generacio de dades
+# ---------------------------
+#funcio per generar un ventas.csv sintetic (reproduible amb la llavor)
+def generar_ventas_csv(ruta: str, filas: int, n_clientes: int = 1000, n_eventos: int = 50,
+                       dias: int = 365, semilla: int = 42) -> None:
+    rnd = random.Random(semilla)
+    inicio = date(2025, 1, 1)
+    fechas = [(inicio + timedelta(days=d)).isoformat() for d in range(dias)]
+    with open(ruta, 'w', newline='', encoding='utf-8') as fh:
+        fh.write(','.join(pf.CAMPOS_VENTAS) + '\n')
+        for i in range(1, filas + 1):
+            fh.write(f"{i},{rnd.randint(1, n_clientes)},{rnd.randint(1, n_eventos)},"
+                     f"{rnd.choice(fechas)},{rnd.randint(500, 15000) / 100}\n")
+
+
+#funcio per generar clientes.csv, eventos.csv i ventas.csv dins dir_data
+def generar_datos(dir_data: str, n_clientes: int, n_eventos: int, n_ventas: int, semilla: int = 42) -> None:
+    rnd = random.Random(semilla)
+    os.makedirs(dir_data, exist_ok=True)
+    inicio = date(2024, 1, 1)
+    categorias = ['Concierto', 'Taller', 'Conferencia', 'Gastronomía', 'Teatro', 'Deporte']
+    with open(os.path.join(dir_data, 'clientes.csv'), 'w', newline='', encoding='utf-8') as fh:
+        fh.write(','.join(pf.CAMPOS_CLIENTES) + '\n')
+        for i in range(1, n_clientes + 1):
+            alta = inicio + timedelta(days=rnd.randrange(730))
+            fh.write(f"{i},Cliente {i},cliente{i}@example.com,{alta.isoformat()}\n")
+    with open(os.path.join(dir_data, 'eventos.csv'), 'w', newline='', encoding='utf-8') as fh:
+        fh.write(','.join(pf.CAMPOS_EVENTOS) + '\n')
+        for i in range(1, n_eventos + 1):
+            fecha = inicio + timedelta(days=rnd.randrange(1095))
+            fh.write(f"{i},Evento {i},{fecha.isoformat()},{rnd.choice(categorias)},{rnd.randint(500, 15000) / 100}\n")
+    generar_ventas_csv(os.path.join(dir_data, 'ventas.csv'), n_ventas, n_clientes, n_eventos,
+                       dias=730, semilla=semilla)
+
+
+
+
+
+# ---------------------------
+# Benchmarks
+# ---------------------------
+#versio antiga de parse_fecha (sempre strptime, sense cache) per comparar
+def _parse_fecha_strptime(fecha_str: str) -> date:
+    return datetime.strptime(fecha_str, pf.FECHA_FMT).date()
+
+
+#funcio per mesurar files/s llegint ventas.csv amb el parse_fecha actual
+def _filas_por_segundo(ruta: str) -> float:
+    t0 = time.perf_counter()
+    n = sum(len(bloque) for bloque in pf.leer_csv_por_bloques(ruta, 'ventas'))
+    return n / (time.perf_counter() - t0)
+
+
+#funcio per comparar parse_fecha abans (strptime) i ara (cami rapid + cache)
+def bench_fechas(filas: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, 'ventas.csv')
+        generar_ventas_csv(ruta, filas)
+
+        original = pf.parse_fecha
+        try:
+            pf.parse_fecha = _parse_fecha_strptime
+            antes = _filas_por_segundo(ruta)
+        finally:
+            pf.parse_fecha = original
+        pf.parse_fecha.cache_clear()
+        despues = _filas_por_segundo(ruta)
+
+    print(f"ventas.csv sintético: {filas} filas")
+    print(f"  strptime:          {antes:12,.0f} filas/s")
+    print(f"  rápido + caché:    {despues:12,.0f} filas/s  (x{despues / antes:.2f})")
+    print(f"  caché: {pf.parse_fecha.cache_info()}")
+
+
+
+
+
+#funcio per mesurar els bytes que ocupa una taula construida per crear()
+def _bytes_por_fila(crear: Callable[[], object], filas: int) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tabla = crear()
+    ocupado = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del tabla
+    return ocupado / filas
+
+
+#funcio per mesurar la memoria per fila de cada taula (files convertides com al carregar el csv)
+def bench_memoria(filas: int) -> None:
+    rnd = random.Random(42)
+    inicio = date(2025, 1, 1)
+    fechas = [(inicio + timedelta(days=d)).isoformat() for d in range(365)]
+    categorias = ['Concierto', 'Taller', 'Conferencia', 'Gastronomía', 'Teatro']
+
+    def clientes() -> List[pf.Cliente]:
+        return [pf.Cliente(*pf._convertir_cliente([str(i), f"Cliente {i}", f"cliente{i}@example.com", rnd.choice(fechas)]))
+                for i in range(1, filas + 1)]
+
+    def eventos() -> List[pf.Evento]:
+        # ''.join(...) crea una categoria nova per fila, com passaria llegint del csv
+        return [pf.Evento(*pf._convertir_evento([str(i), f"Evento {i}", rnd.choice(fechas),
+                                                 ''.join(rnd.choice(categorias)), "35.0"]))
+                for i in range(1, filas + 1)]
+
+    def filas_ventas() -> List[list]:
+        return [[str(i), str(rnd.randint(1, 1000)), str(rnd.randint(1, 50)), rnd.choice(fechas), "49.9"]
+                for i in range(1, filas + 1)]
+
+    crudas = filas_ventas()
+
+    def ventas() -> List[pf.Venta]:
+        return [pf.Venta(*pf._convertir_venta(f)) for f in crudas]
+
+    def ventas_columnar() -> pf.ColumnasVentas:
+        col = pf.ColumnasVentas()
+        col.extend_filas([pf._convertir_venta(f) for f in crudas])
+        return col
+
+    print(f"Memoria por fila con {filas} filas:")
+    for nombre, crear in (('clientes', clientes), ('eventos', eventos),
+                          ('ventas', ventas), ('ventas (columnar)', ventas_columnar)):
+        print(f"  {nombre:18} {_bytes_por_fila(crear, filas):8.1f} bytes/fila")
+
+
+
+
+
+#context per respondre els input() d'un metode interactiu i amagar els print
+@contextlib.contextmanager
+def _sin_terminal(respuestas: List[str]) -> Iterator[None]:
+    pendientes = iter(respuestas)
+    original = builtins.input
+    builtins.input = lambda prompt='': next(pendientes)
+    try:
+        with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+            yield
+    finally:
+        builtins.input = original
+
+
+#funcio per mesurar temps i pic de memoria d'una operacio
+def _medir(operacion: Callable[[], None], filas: int, repeticiones: int = 1) -> Dict[str, float]:
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        operacion()
+    segundos = (time.perf_counter() - t0) / repeticiones
+    # el pic es mesura en una altra passada, tracemalloc alenteix molt
+    tracemalloc.start()
+    operacion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'segundos': round(segundos, 6),
+        'filas_por_segundo': round(filas / segundos, 1) if segundos else None,
+        'pico_memoria_bytes': pico,
+    }
+
+
+#funcio per crear la BD del motor indicat
+def _crear_bd(motor: str) -> pf.BD:
+    if motor == 'sqlite':
+        return pf.BDSQLite()
+    return pf.BD(columnar=(motor == 'columnar'))
+
+
+#funcio per executar la suite sobre dades sintetiques i retornar els resultats
+def ejecutar_suite(n_clientes: int, n_eventos: int, n_ventas: int, motor: str = 'memoria',
+                   altas: int = 1000, semilla: int = 42) -> Dict[str, object]:
+    resultados: Dict[str, object] = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        generar_datos(os.path.join(tmp, 'data'), n_clientes, n_eventos, n_ventas, semilla)
+        # la BD treballa sobre ./data
+        os.chdir(tmp)
+        try:
+            bd = _crear_bd(motor)
+            filas = n_clientes + n_eventos + n_ventas
+
+            def cargar() -> None:
+                if motor == 'sqlite':
+                    # si no, la segona passada no tornaria a importar res
+                    bd.con.execute("DELETE FROM meta")
+                with _sin_terminal([]):
+                    bd.cargar_datos()
+
+            resultados['cargar_datos'] = _medir(cargar, filas)
+
+            # finestra d'una setmana, com una consulta tipica
+            def filtrar() -> None:
+                with _sin_terminal(['2025-06-01', '2025-06-07']):
+                    bd.filtrar_ventas_por_rango()
+
+            resultados['filtrar_ventas_por_rango'] = _medir(filtrar, n_ventas, repeticiones=5)
+
+            def estadisticas() -> None:
+                with _sin_terminal([]):
+                    bd.estadisticas()
+
+            resultados['estadisticas'] = _medir(estadisticas, n_ventas, repeticiones=5)
+
+            def informe() -> None:
+                with _sin_terminal([]):
+                    bd.exportar_informe()
+
+            resultados['exportar_informe'] = _medir(informe, n_ventas, repeticiones=5)
+
+            contador = iter(range(10 ** 9))
+
+            def alta() -> None:
+                for _ in range(altas):
+                    n = next(contador)
+                    with _sin_terminal([f"Nuevo {n}", f"nuevo{n}@bench.com", '2025-01-01']):
+                        bd.alta_cliente()
+
+            medida = _medir(alta, altas)
+            resultados['alta_cliente'] = medida
+            bd.cerrar()
+        finally:
+            os.chdir(cwd)
+    return {
+        'version_python': platform.python_version(),
+        'motor': motor,
+        'clientes': n_clientes,
+        'eventos': n_eventos,
+        'ventas': n_ventas,
+        'operaciones': resultados,
+    }
+
+
+
+
+
+# ---------------------------
+# Main
+# ---------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks de la Práctica final")
+    sub = parser.add_subparsers(dest='bench', required=True)
+    p_generar = sub.add_parser('generar', help="genera clientes/eventos/ventas sintéticos")
+    p_generar.add_argument('dir')
+    p_suite = sub.add_parser('suite', help="tiempos y memoria de las operaciones de BD (JSON)")
+    for p in (p_generar, p_suite):
+        p.add_argument('--clientes', type=int, default=10_000)
+        p.add_argument('--eventos', type=int, default=1_000)
+        p.add_argument('--ventas', type=int, default=100_000)
+        p.add_argument('--semilla', type=int, default=42)
+    p_suite.add_argument('--motor', choices=['memoria', 'columnar', 'sqlite'], default='memoria')
+    p_suite.add_argument('--altas', type=int, default=1000)
+    p_suite.add_argument('--salida', help="fichero JSON de salida (por defecto, por pantalla)")
+    p_fechas = sub.add_parser('fechas', help="parse_fecha antes/después al leer ventas.csv")
+    p_fechas.add_argument('--filas', type=int, default=1_000_000)
+    p_memoria = sub.add_parser('memoria', help="bytes por fila de cada tabla")
+    p_memoria.add_argument('--filas', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.bench == 'generar':
+        generar_datos(args.dir, args.clientes, args.eventos, args.ventas, args.semilla)
+    elif args.bench == 'suite':
+        resultado = ejecutar_suite(args.clientes, args.eventos, args.ventas, args.motor, args.altas, args.semilla)
+        texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+        if args.salida:
+            with open(args.salida, 'w', encoding='utf-8') as fh:
+                fh.write(texto + '\n')
+        else:
+            print(texto)
+    elif args.bench == 'fechas':
+        bench_fechas(args.filas)
+    elif args.bench == 'memoria':
+        bench_memoria(args.filas)
+
+
+if __name__ == '__main__':
+    main()